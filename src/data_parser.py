@@ -2,27 +2,50 @@
 실제 센서 데이터 파싱 모듈
 CSV 형태의 센서 데이터를 파싱하여 8개 계류줄에 분산 저장
 """
+import csv
+import io
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import random
 
 from src.models import MooringLine, TensionHistory
 
+# process_file 일괄 저장 단위 및 COPY 대상 컬럼 (PostgreSQL)
+COPY_BATCH_SIZE = 10000
+COPY_COLUMNS = ('mooring_line_id', 'tension_value', 'line_length', 'distance_to_port', 'raw_timestamp', 'timestamp')
+
+# CSV 센서 블록 레이아웃: CSV,DIST,<d>cm,[<이름>,T,<장력>,LEN,<길이>m,SPD,<v>,OVR,<v>,BRK,<v>] x N
+# (마지막 블록은 SPD 이후 필드가 생략될 수 있으므로 이름~길이 5개 필드만 있으면 파싱)
+SENSOR_BLOCK_START = 3
+SENSOR_BLOCK_STRIDE = 11
+SENSOR_BLOCK_MIN_FIELDS = 5
+
+# initialize_mooring_lines 호출 시 증가 - 파서의 계류줄 PK 캐시 무효화용
+_mooring_lines_version = 0
+
 
 class SensorDataParser:
     """센서 데이터 파서 - 8개 계류줄 지원"""
     
-    def __init__(self):
-        # 실제 센서 데이터를 8개 계류줄에 매핑
-        self.sensor_to_line_mapping = {
-            'L0-BREAST': {'target_lines': ['L0', 'L4'], 'multiplier': [1.0, 0.8]},
-            'L1-BREAST': {'target_lines': ['L1', 'L5'], 'multiplier': [1.0, 0.9]},
-            'L2-SPRING': {'target_lines': ['L2', 'L6'], 'multiplier': [1.0, 0.85]},
-            'L3-SPRING': {'target_lines': ['L3', 'L7'], 'multiplier': [1.0, 0.75]}
-        }
-        
+    # 타임스탬프 정규식 (호출마다 컴파일하지 않도록 클래스 로드 시 1회 컴파일)
+    _TS_RE = re.compile(r'^(\d{2}:\d{2}:\d{2}\.\d{3})')
+    
+    # 실제 센서 데이터를 8개 계류줄에 매핑: (센서 이름, ((대상 계류줄, 배율), ...))
+    _MAPPING_FLAT = (
+        ('L0-BREAST', (('L0', 1.0), ('L4', 0.8))),
+        ('L1-BREAST', (('L1', 1.0), ('L5', 0.9))),
+        ('L2-SPRING', (('L2', 1.0), ('L6', 0.85))),
+        ('L3-SPRING', (('L3', 1.0), ('L7', 0.75)))
+    )
+    
+    def __init__(self, rng: Optional[random.Random] = None):
+        # 확장 라인 변동용 난수 생성기 (시뮬레이터가 seed 지정 인스턴스를 공유)
+        self._rng = rng if rng is not None else random.Random()
         self.line_mapping = {
             'L0': {'id': 'L0', 'side': 'PORT', 'type': 'BREAST', 'index': 0},
             'L1': {'id': 'L1', 'side': 'STARBOARD', 'type': 'BREAST', 'index': 0},
@@ -33,6 +56,18 @@ class SensorDataParser:
             'L6': {'id': 'L6', 'side': 'PORT', 'type': 'SPRING', 'index': 3},
             'L7': {'id': 'L7', 'side': 'STARBOARD', 'type': 'SPRING', 'index': 3}
         }
+        
+        # 계류줄 PK 캐시 (line_id -> mooring_lines.id), 8개 계류줄은 고정이므로 1회만 조회
+        self._line_pk_cache: Dict[str, int] = {}
+        self._line_pk_cache_version = -1
+    
+    def _ensure_cache(self, db: Session):
+        """계류줄 PK 캐시가 비어있거나 무효화된 경우 한 번에 다시 채움"""
+        if self._line_pk_cache and self._line_pk_cache_version == _mooring_lines_version:
+            return
+        
+        self._line_pk_cache = dict(db.query(MooringLine.line_id, MooringLine.id).all())
+        self._line_pk_cache_version = _mooring_lines_version
     
     def parse_csv_line(self, line: str) -> Optional[Dict]:
         """
@@ -59,14 +94,16 @@ class SensorDataParser:
         """
         try:
             # 타임스탬프 추출
-            timestamp_match = re.match(r'^(\d{2}:\d{2}:\d{2}\.\d{3})', line)
+            timestamp_match = self._TS_RE.match(line)
             if not timestamp_match:
                 return None
             
             timestamp = timestamp_match.group(1)
             
             # CSV 데이터 부분 추출
-            csv_part = line.split(' -> ')[1] if ' -> ' in line else line
+            _, separator, csv_part = line.partition(' -> ')
+            if not separator:
+                csv_part = line
             parts = csv_part.split(',')
             
             if len(parts) < 3 or parts[0] != 'CSV':
@@ -75,48 +112,35 @@ class SensorDataParser:
             # 거리 정보 추출
             distance = None
             if parts[1] == 'DIST' and parts[2].endswith('cm'):
-                distance = float(parts[2].replace('cm', ''))
+                distance = float(parts[2][:-2])
             
-            # 원본 센서 데이터 파싱
+            # 원본 센서 데이터 파싱 - 고정 레이아웃이므로 필드 위치를 산술로 계산
             original_lines_data = {}
-            i = 3
-            while i < len(parts):
-                if i + 5 < len(parts):
-                    line_name = parts[i]
-                    if parts[i+1] == 'T':  # Tension
-                        tension = float(parts[i+2])
-                    if parts[i+3] == 'LEN':  # Length
-                        length = float(parts[i+4].replace('m', ''))
-                    
-                    original_lines_data[line_name] = {
-                        'tension': tension,
-                        'length': length
-                    }
-                    
-                    # 다음 계류줄로 이동 (각 계류줄당 8개 필드)
-                    i += 8
-                else:
-                    break
+            for offset in range(SENSOR_BLOCK_START, len(parts) - SENSOR_BLOCK_MIN_FIELDS + 1, SENSOR_BLOCK_STRIDE):
+                if parts[offset + 1] != 'T' or parts[offset + 3] != 'LEN':
+                    continue  # 형식이 맞지 않는 블록은 스킵
+                
+                original_lines_data[parts[offset]] = {
+                    'tension': float(parts[offset + 2]),
+                    'length': float(parts[offset + 4].rstrip('m'))
+                }
             
-            # 8개 계류줄에 데이터 분산
+            # 8개 계류줄에 데이터 분산 (약간의 랜덤 변화 ±3% 추가)
             expanded_lines_data = {}
+            uniform = self._rng.uniform
             
-            for sensor_line, sensor_data in original_lines_data.items():
-                if sensor_line in self.sensor_to_line_mapping:
-                    mapping = self.sensor_to_line_mapping[sensor_line]
-                    target_lines = mapping['target_lines']
-                    multipliers = mapping['multiplier']
-                    
-                    for i, target_line in enumerate(target_lines):
-                        multiplier = multipliers[i]
-                        # 약간의 랜덤 변화 추가 (±3%)
-                        variation = random.uniform(0.97, 1.03)
-                        final_tension = sensor_data['tension'] * multiplier * variation
-                        
-                        expanded_lines_data[target_line] = {
-                            'tension': round(final_tension, 3),
-                            'length': sensor_data['length']
-                        }
+            for sensor_line, targets in self._MAPPING_FLAT:
+                sensor_data = original_lines_data.get(sensor_line)
+                if sensor_data is None:
+                    continue
+                
+                tension = sensor_data['tension']
+                length = sensor_data['length']
+                for target_line, multiplier in targets:
+                    expanded_lines_data[target_line] = {
+                        'tension': round(tension * multiplier * uniform(0.97, 1.03), 3),
+                        'length': length
+                    }
             
             return {
                 'timestamp': timestamp,
@@ -128,37 +152,70 @@ class SensorDataParser:
             print(f"파싱 에러: {e}, 라인: {line}")
             return None
     
+    def build_rows(self, parsed_data: Dict, db: Session):
+        """파싱된 데이터로 장력 이력 INSERT 행과 계류줄 UPDATE 매핑 생성"""
+        self._ensure_cache(db)
+        
+        now = datetime.utcnow()
+        distance = parsed_data['distance']
+        history_rows = []
+        line_updates = []
+        
+        for line_id, line_data in parsed_data['lines'].items():
+            if line_id not in self.line_mapping:
+                continue
+            
+            mooring_line_id = self._line_pk_cache.get(line_id)
+            if mooring_line_id is None:
+                continue  # 계류줄이 존재하지 않으면 스킵
+            
+            # 장력 이력 데이터
+            history_rows.append({
+                'mooring_line_id': mooring_line_id,
+                'tension_value': line_data['tension'],
+                'line_length': line_data['length'],
+                'distance_to_port': distance,
+                'raw_timestamp': parsed_data['timestamp'],
+                'timestamp': now
+            })
+            
+            # 현재 장력 업데이트
+            update = {'id': mooring_line_id, 'current_tension': line_data['tension']}
+            if distance:
+                update['distance_to_port'] = distance
+            line_updates.append(update)
+        
+        return history_rows, line_updates
+    
+    def _write_history_rows(self, history_rows: List[Dict], db: Session):
+        """장력 이력 일괄 저장 - PostgreSQL은 COPY, 그 외는 executemany INSERT"""
+        if db.get_bind().dialect.name == 'postgresql':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in history_rows:
+                writer.writerow([row[column] for column in COPY_COLUMNS])
+            buffer.seek(0)
+            
+            # 세션과 같은 트랜잭션의 DBAPI 커넥션 사용 (psycopg2)
+            cursor = db.connection().connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {TensionHistory.__tablename__} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH CSV",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            db.execute(insert(TensionHistory), history_rows)
+    
     def save_parsed_data(self, parsed_data: Dict, db: Session):
-        """파싱된 데이터를 8개 계류줄에 저장"""
+        """파싱된 데이터를 8개 계류줄에 저장 (계류줄당 개별 INSERT 대신 일괄 처리)"""
         try:
-            for line_id, line_data in parsed_data['lines'].items():
-                if line_id not in self.line_mapping:
-                    continue
-                
-                # 계류줄 정보 조회
-                mooring_line = db.query(MooringLine).filter(
-                    MooringLine.line_id == line_id
-                ).first()
-                
-                if not mooring_line:
-                    continue  # 계류줄이 존재하지 않으면 스킵
-                
-                # 장력 이력 데이터 저장
-                tension_history = TensionHistory(
-                    mooring_line_id=mooring_line.id,
-                    tension_value=line_data['tension'],
-                    line_length=line_data['length'],
-                    distance_to_port=parsed_data['distance'],
-                    raw_timestamp=parsed_data['timestamp'],
-                    timestamp=datetime.utcnow()
-                )
-                
-                db.add(tension_history)
-                
-                # 현재 장력 업데이트
-                mooring_line.current_tension = line_data['tension']
-                if parsed_data['distance']:
-                    mooring_line.distance_to_port = parsed_data['distance']
+            history_rows, line_updates = self.build_rows(parsed_data, db)
+            
+            if history_rows:
+                db.execute(insert(TensionHistory), history_rows)
+                db.bulk_update_mappings(MooringLine, line_updates)
             
             db.commit()
             
@@ -166,34 +223,120 @@ class SensorDataParser:
             db.rollback()
             print(f"데이터 저장 에러: {e}")
     
-    def process_file(self, file_path: str, db: Session) -> int:
-        """파일 전체를 처리하여 데이터베이스에 저장"""
+    def _iter_parsed_file(self, file_path: str):
+        """파일을 순차적으로 읽어 파싱 결과를 하나씩 반환"""
         processed_count = 0
+        with open(file_path, 'r', encoding='utf-8') as file:
+            for line_num, line in enumerate(file, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                parsed_data = self.parse_csv_line(line)
+                if parsed_data:
+                    processed_count += 1
+                    yield parsed_data
+                
+                # 10줄마다 진행상황 출력
+                if line_num % 10 == 0:
+                    print(f"처리된 라인: {line_num}, 저장된 데이터: {processed_count}")
+    
+    def _iter_parsed_file_parallel(self, file_path: str, workers: int):
+        """파일을 바이트 구간으로 나눠 프로세스 풀에서 병렬 파싱, 구간 순서대로 결과 반환"""
+        file_size = os.path.getsize(file_path)
+        chunk_size = max(file_size // workers, 1)
+        ranges = [(offset, min(offset + chunk_size, file_size)) for offset in range(0, file_size, chunk_size)]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(
+                _parse_file_range,
+                [file_path] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges]
+            )
+            for chunk_num, parsed_chunk in enumerate(chunks, 1):
+                print(f"처리된 구간: {chunk_num}/{len(ranges)}, 파싱된 데이터: {len(parsed_chunk)}")
+                yield from parsed_chunk
+    
+    def process_file(self, file_path: str, db: Session, workers: int = 1) -> int:
+        """
+        파일 전체를 처리하여 데이터베이스에 저장 (COPY_BATCH_SIZE 행 단위 일괄 저장, 1회 커밋)
+        
+        workers > 1 이면 대용량 백필용으로 파싱을 프로세스 풀에서 병렬 수행하고,
+        저장은 현재 프로세스에서 단일 writer로 처리
+        """
+        processed_count = 0
+        pending_rows = []
+        latest_updates = {}  # mooring_lines.id -> 마지막 현재 장력/거리
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    parsed_data = self.parse_csv_line(line)
-                    if parsed_data:
-                        self.save_parsed_data(parsed_data, db)
-                        processed_count += 1
-                    
-                    # 10줄마다 진행상황 출력
-                    if line_num % 10 == 0:
-                        print(f"처리된 라인: {line_num}, 저장된 데이터: {processed_count}")
+            if workers > 1:
+                parsed_items = self._iter_parsed_file_parallel(file_path, workers)
+            else:
+                parsed_items = self._iter_parsed_file(file_path)
+            
+            for parsed_data in parsed_items:
+                history_rows, line_updates = self.build_rows(parsed_data, db)
+                pending_rows.extend(history_rows)
+                for update in line_updates:
+                    latest_updates.setdefault(update['id'], {}).update(update)
+                processed_count += 1
+                
+                if len(pending_rows) >= COPY_BATCH_SIZE:
+                    self._write_history_rows(pending_rows, db)
+                    pending_rows = []
+            
+            if pending_rows:
+                self._write_history_rows(pending_rows, db)
+            if latest_updates:
+                db.bulk_update_mappings(MooringLine, list(latest_updates.values()))
+            
+            db.commit()
         
         except Exception as e:
+            db.rollback()
             print(f"파일 처리 에러: {e}")
+            return 0
         
         return processed_count
 
 
+# 워커 프로세스별 파서 (구간마다 새로 만들지 않고 프로세스당 1회 생성해 재사용)
+_worker_parser: Optional[SensorDataParser] = None
+
+
+def _parse_file_range(file_path: str, start: int, end: int) -> List[Dict]:
+    """[start, end) 바이트 구간에서 시작하는 라인들을 파싱 (ProcessPoolExecutor 작업 단위)"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = SensorDataParser()
+    parser = _worker_parser
+    results = []
+    
+    with open(file_path, 'rb') as file:
+        if start > 0:
+            # 이전 구간에서 시작된 라인은 건너뜀 (start 직전이 줄바꿈이면 start부터 시작)
+            file.seek(start - 1)
+            file.readline()
+        
+        while file.tell() < end:
+            raw_line = file.readline()
+            if not raw_line:
+                break
+            
+            line = raw_line.decode('utf-8').strip()
+            if line:
+                parsed_data = parser.parse_csv_line(line)
+                if parsed_data:
+                    results.append(parsed_data)
+    
+    return results
+
+
 def initialize_mooring_lines(db: Session):
     """8개 계류줄 초기 데이터 생성"""
+    global _mooring_lines_version
+    
     lines_config = [
         # 좌측 (PORT) 4개
         {'line_id': 'L0', 'name': 'L0-PORT-BREAST', 'type': 'BREAST', 'side': 'PORT', 'index': 0, 'ref_tension': 1.0},
@@ -208,21 +351,29 @@ def initialize_mooring_lines(db: Session):
         {'line_id': 'L7', 'name': 'L7-STARBOARD-SPRING', 'type': 'SPRING', 'side': 'STARBOARD', 'index': 3, 'ref_tension': 0.7}
     ]
     
-    for config in lines_config:
-        existing = db.query(MooringLine).filter(MooringLine.line_id == config['line_id']).first()
-        if not existing:
-            mooring_line = MooringLine(
-                line_id=config['line_id'],
-                name=config['name'],
-                line_type=config['type'],
-                side=config['side'],
-                position_index=config['index'],
-                reference_tension=config['ref_tension'],
-                max_tension=config['ref_tension'] * 2.0,
-                current_tension=0.0,
-                distance_to_port=14.5  # 기본값
-            )
-            db.add(mooring_line)
+    # 존재 여부 확인에는 line_id만 필요하므로 전체 행 대신 한 컬럼만 1회 조회
+    existing_line_ids = {line_id for (line_id,) in db.query(MooringLine.line_id)}
+    
+    new_lines = [
+        {
+            'line_id': config['line_id'],
+            'name': config['name'],
+            'line_type': config['type'],
+            'side': config['side'],
+            'position_index': config['index'],
+            'reference_tension': config['ref_tension'],
+            'max_tension': config['ref_tension'] * 2.0,
+            'current_tension': 0.0,
+            'distance_to_port': 14.5  # 기본값
+        }
+        for config in lines_config
+        if config['line_id'] not in existing_line_ids
+    ]
+    
+    # 누락된 계류줄을 단일 multi-row INSERT로 생성 (객체별 unit-of-work 추적 없음)
+    if new_lines:
+        db.execute(insert(MooringLine), new_lines)
     
     db.commit()
+    _mooring_lines_version += 1
     print("8개 계류줄 초기화 완료")
\ No newline at end of file
@@ -1,7 +1,9 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+import math
+import sqlite3
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 import os
@@ -15,13 +17,70 @@ DATABASE_URL = os.getenv(
     "sqlite:///./mooring_system.db"  # SQLite for development
 )
 
+# SQL statement logging (every statement goes through the logging handler - keep off in production)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
+# Worker threads for sync (def) endpoints (anyio's thread limiter, applied at startup in main.py).
+# Each can hold one pooled connection, so the pool below is sized from it
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "40"))  # anyio's default
+# Connections taken outside the limiter: dashboard executor (4 threads), the simulator's session,
+# its line-cache refresh and the dashboard push ticker - plus a little spare
+DB_POOL_HEADROOM = int(os.getenv("DB_POOL_HEADROOM", "8"))
+
+# Connection pool: pool_size kept warm, overflow covers the rest of the limiter + headroom
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv(
+    "DB_MAX_OVERFLOW", str(max(API_THREADPOOL_SIZE + DB_POOL_HEADROOM - DB_POOL_SIZE, 0))
+))
+
+# Driver-specific engine options
+engine_options = {}
+if ":memory:" not in DATABASE_URL and DATABASE_URL not in ("sqlite://", "sqlite:///"):
+    # File databases and servers use a QueuePool; in-memory SQLite keeps one connection per thread
+    engine_options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+if "sqlite" not in DATABASE_URL:
+    engine_options["pool_recycle"] = 3600  # Recycle before server-side idle timeouts drop the connection
+if DATABASE_URL.startswith(("postgresql://", "postgresql+psycopg2://")):
+    # psycopg2: multi-row VALUES for INSERT executemany, execute_batch for UPDATE/DELETE
+    engine_options["executemany_mode"] = "values_plus_batch"
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=True  # Set to False in production
+    echo=SQL_ECHO,
+    pool_pre_ping=True,  # Detect stale connections before handing them out
+    # Rows per multi-row INSERT batch for Core insert() executemany (tension history, alerts)
+    insertmanyvalues_page_size=int(os.getenv("DB_INSERT_PAGE_SIZE", "1000")),
+    **engine_options
 )
 
+if "sqlite" in DATABASE_URL:
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        # WAL lets API reads run alongside the simulation writer; NORMAL skips the fsync on every commit
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        # Temp b-trees (GROUP BY / ORDER BY spills) in memory; hot pages read through mmap instead of read()
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # sin/cos for the circular wind-direction mean in chart buckets; only builds without
+        # SQLITE_ENABLE_MATH_FUNCTIONS need the Python versions
+        try:
+            cursor.execute("SELECT sin(0), cos(0)")
+        except sqlite3.OperationalError:
+            # NULL in, NULL out like the built-ins (weather is outer-joined)
+            dbapi_connection.create_function(
+                "sin", 1, lambda x: None if x is None else math.sin(x), deterministic=True
+            )
+            dbapi_connection.create_function(
+                "cos", 1, lambda x: None if x is None else math.cos(x), deterministic=True
+            )
+        cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -43,9 +102,41 @@ def init_db():
     """
     from src.models import Base
     Base.metadata.create_all(bind=engine)
+    _migrate_mooring_lines()
     print("Database tables created successfully!")
 
 
+def _migrate_mooring_lines():
+    """
+    Add mooring_lines columns introduced after the first release to existing databases
+    (create_all only creates missing tables, it never alters existing ones)
+    """
+    from sqlalchemy import inspect, text
+    columns = {column["name"] for column in inspect(engine).get_columns("mooring_lines")}
+    with engine.begin() as conn:
+        if "critical_sample_count" not in columns:
+            # Lifespan counter - backfilled from the CRITICAL history already recorded
+            conn.execute(text("ALTER TABLE mooring_lines ADD COLUMN critical_sample_count INTEGER DEFAULT 0"))
+            conn.execute(text(
+                "UPDATE mooring_lines SET critical_sample_count = ("
+                "SELECT COUNT(*) FROM tension_history t "
+                "WHERE t.mooring_line_id = mooring_lines.id AND t.status = 'CRITICAL')"
+            ))
+            print("Migrated mooring_lines: added critical_sample_count")
+        if "last_status" not in columns:
+            # Alert edge detection - seeded by classifying each line's latest reading (current_tension)
+            # with the thresholds of MooringLineService.tension_thresholds, so the first sample after
+            # the upgrade does not raise a duplicate alert for a line already in WARNING/CRITICAL
+            conn.execute(text("ALTER TABLE mooring_lines ADD COLUMN last_status VARCHAR(20) DEFAULT 'NORMAL'"))
+            conn.execute(text(
+                "UPDATE mooring_lines SET last_status = CASE "
+                "WHEN current_tension >= max_tension * 0.9 THEN 'CRITICAL' "
+                "WHEN current_tension >= reference_tension * 1.2 THEN 'WARNING' "
+                "ELSE 'NORMAL' END"
+            ))
+            print("Migrated mooring_lines: added last_status")
+
+
 def drop_db():
     """
     Drop all database tables
@@ -3,14 +3,31 @@
 실제 센서 데이터를 30초마다 순환하면서 업데이트하고 알림 생성
 """
 import asyncio
+import itertools
+import logging
 import time
 from datetime import datetime
 from sqlalchemy.orm import Session
 from src.database import SessionLocal
 from src.data_parser import SensorDataParser
+from src.logging_config import get_queue_logger
 from src.models import MooringLine, TensionHistory, Alert
+from sqlalchemy import insert, select, update
 import random
-from typing import List, Dict
+from typing import List, Dict, Optional, Callable, Awaitable
+
+# 시뮬레이션 로거 - 틱 경로에서는 큐에 넣기만 하고 출력은 백그라운드 스레드(QueueListener)가 담당
+logger = get_queue_logger("sim")
+
+# 장력 이력 일괄 저장 조건: 대기 틱 수 또는 마지막 저장 후 경과 시간 (초)
+HISTORY_FLUSH_TICKS = 10
+HISTORY_FLUSH_MAX_DELAY = 30.0
+
+# 알림 메시지 템플릿 (이름, 장력, 기준 장력)
+_MSG_OVER = "⚠️ {} 장력 초과: {:.2f}N > 기준 {:.2f}N"
+_MSG_CAUTION = "🔶 {} 장력 주의: {:.2f}N (기준: {:.2f}N)"
+_MSG_UNDER = "🔻 {} 장력 저하: {:.2f}N < 기준 {:.2f}N"
+_MSG_NORMAL = "✅ {0}: {1:.2f}N (정상)"
 
 class AlertManager:
     """알림 관리 시스템 - 최대 5개 알림 유지"""
@@ -19,86 +36,148 @@ class AlertManager:
         self.max_alerts = 5
         self.alert_history = []
     
-    def create_alert(self, db: Session, line_name: str, tension: float, reference: float, alert_type: str = "TENSION_UPDATE"):
-        """새로운 알림 생성"""
-        try:
-            # 기존 알림 정리 (5개 이상이면 오래된 것 삭제)
-            existing_alerts = db.query(Alert).filter(Alert.is_resolved == False).order_by(Alert.created_at.desc()).all()
-            
-            if len(existing_alerts) >= self.max_alerts:
-                # 가장 오래된 알림들을 해결됨으로 표시
-                alerts_to_resolve = existing_alerts[self.max_alerts-1:]
-                for alert in alerts_to_resolve:
-                    alert.is_resolved = True
-                    alert.resolved_at = datetime.utcnow()
-            
-            # 새 알림 생성
-            message = f"{line_name} 장력 업데이트: {tension:.2f}N (기준: {reference:.2f}N)"
-            severity = "LOW"
-            
-            if tension > reference * 1.2:
-                severity = "HIGH"
-                message = f"⚠️ {line_name} 장력 초과: {tension:.2f}N > 기준 {reference:.2f}N"
-            elif tension > reference * 1.1:
-                severity = "MEDIUM"
-                message = f"🔶 {line_name} 장력 주의: {tension:.2f}N (기준: {reference:.2f}N)"
-            elif tension < reference * 0.5:
-                severity = "MEDIUM"
-                message = f"🔻 {line_name} 장력 저하: {tension:.2f}N < 기준 {reference:.2f}N"
-            else:
-                message = f"✅ {line_name}: {tension:.2f}N (정상)"
-            
-            new_alert = Alert(
-                alert_type=alert_type,
-                message=message,
-                severity=severity,
-                is_resolved=False,
-                created_at=datetime.utcnow()
-            )
-            
-            db.add(new_alert)
-            db.commit()
-            
-            return new_alert
-            
-        except Exception as e:
-            print(f"알림 생성 오류: {e}")
-            db.rollback()
-            return None
+    @staticmethod
+    def thresholds_for(reference: float) -> tuple:
+        """기준 장력별 (초과, 주의, 저하) 임계값 - 계류줄 캐시에 미리 계산해 둠"""
+        return (reference * 1.2, reference * 1.1, reference * 0.5)
+    
+    def build_alert(self, line_name: str, tension: float, reference: float, created_at: datetime,
+                    alert_type: str = "TENSION_UPDATE", thresholds: Optional[tuple] = None) -> Dict:
+        """알림 INSERT 행 생성 (저장은 create_alerts에서 일괄 처리)"""
+        over, caution, under = thresholds or self.thresholds_for(reference)
+        
+        # 심각도와 메시지 템플릿만 먼저 고르고 문자열은 한 번만 생성
+        if tension > over:
+            severity, template = "HIGH", _MSG_OVER
+        elif tension > caution:
+            severity, template = "MEDIUM", _MSG_CAUTION
+        elif tension < under:
+            severity, template = "MEDIUM", _MSG_UNDER
+        else:
+            severity, template = "LOW", _MSG_NORMAL
+        message = template.format(line_name, tension, reference)
+        
+        return {
+            'alert_type': alert_type,
+            'message': message,
+            'severity': severity,
+            'is_resolved': False,
+            'created_at': created_at
+        }
+    
+    def create_alerts(self, db: Session, alert_rows: List[Dict]):
+        """알림 일괄 생성 후 최신 max_alerts개만 미해결로 유지 (커밋은 호출자의 틱 트랜잭션에서)"""
+        if not alert_rows:
+            return
+        
+        db.execute(insert(Alert), alert_rows)
+        
+        # 오래된 알림 정리 (최신 5개 외에는 해결됨으로 표시) - 단일 UPDATE 문으로 처리
+        stale_ids = select(Alert.id).where(Alert.is_resolved == False).order_by(
+            Alert.created_at.desc(), Alert.id.desc()
+        ).offset(self.max_alerts)
+        db.execute(
+            update(Alert)
+            .where(Alert.id.in_(stale_ids))
+            .values(is_resolved=True, resolved_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
 
 class LiveDataSimulator:
     """실시간 데이터 시뮬레이션"""
     
-    def __init__(self, data_file_path: str):
+    def __init__(self, data_file_path: str, broadcast: Optional[Callable[[Dict], Awaitable]] = None,
+                 seed: Optional[int] = None):
         self.data_file_path = data_file_path
-        self.parser = SensorDataParser()
+        self.broadcast = broadcast  # 틱 결과를 WebSocket 클라이언트에 push (main의 manager.broadcast)
+        self._rng = random.Random(seed)  # 전용 난수 생성기 (seed 지정 시 재현 가능한 시뮬레이션)
+        self.parser = SensorDataParser(self._rng)
         self.alert_manager = AlertManager()
-        self.data_lines = []
-        self.current_index = 0
+        self.data_line_count = 0  # 파일의 데이터 줄 수 (상태 표시용)
+        self.parsed_cache = ()  # 파일 로드 시 1회 파싱한 결과 (틱마다 재파싱하지 않음)
+        self._cycle = iter(())  # parsed_cache 순환 이터레이터
+        self.current_index = 0  # 지금까지 제공한 데이터 수 (단조 증가)
         self.is_running = False
         self.update_count = 0
         
+        # 중지 신호 - 실행 중인 이벤트 루프에 바인딩되도록 start_simulation에서 생성
+        self._stop_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # 시뮬레이터 전용 세션과 저장 대기 중인 장력 이력 (여러 틱을 모아 한 번에 INSERT)
+        self._session = SessionLocal()
+        self._pending: List[Dict] = []
+        self._pending_ticks = 0
+        self._last_flush = time.monotonic()
+        
+        # 계류줄 정보 캐시 {line_id: (name, reference_tension, 알림 임계값)} - 틱마다 조회하지 않음
+        self._line_cache: Dict[str, tuple] = {}
+        self._line_cache_stale = True
+        
         # 데이터 파일 로드
         self.load_data()
         
     def load_data(self):
-        """센서 데이터 파일을 메모리에 로드"""
+        """센서 데이터 파일을 읽으면서 바로 파싱 (원본 문자열은 메모리에 보관하지 않음)"""
+        # 고정된 순환 데이터이므로 전체를 한 번만 파싱해 둠
+        parsed_cache = []
+        line_count = 0
         try:
             with open(self.data_file_path, 'r', encoding='utf-8') as file:
-                self.data_lines = [line.strip() for line in file if line.strip()]
-            print(f"✅ 센서 데이터 로드 완료: {len(self.data_lines)}줄")
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    line_count += 1
+                    parsed = self.parser.parse_csv_line(line)
+                    if parsed:
+                        parsed_cache.append(parsed)
+            logger.info(f"✅ 센서 데이터 로드 완료: {line_count}줄")
         except Exception as e:
-            print(f"❌ 데이터 파일 로드 실패: {e}")
-            self.data_lines = []
+            logger.error(f"❌ 데이터 파일 로드 실패: {e}")
+            line_count = 0
+            parsed_cache = []
+        
+        self.data_line_count = line_count
+        self.parsed_cache = tuple(parsed_cache)
+        if len(self.parsed_cache) < line_count:
+            logger.warning(f"⚠️ 파싱 실패 라인 제외: {line_count - len(self.parsed_cache)}줄")
+        self._cycle = itertools.cycle(self.parsed_cache)
+        
+        self.refresh_line_cache()
+    
+    def refresh_line_cache(self):
+        """계류줄 이름/기준 장력 캐시 재로드 (짧은 세션 사용)"""
+        db = SessionLocal()
+        try:
+            rows = db.query(MooringLine.line_id, MooringLine.name, MooringLine.reference_tension).all()
+            thresholds_for = AlertManager.thresholds_for
+            self._line_cache = {
+                line_id: (name, reference, thresholds_for(reference))
+                for line_id, name, reference in rows
+            }
+            self._line_cache_stale = False
+        except Exception as e:
+            logger.error(f"❌ 계류줄 캐시 로드 실패: {e}")
+        finally:
+            db.close()
+    
+    def invalidate_line_cache(self):
+        """계류줄 정보 변경 시 호출 - 다음 틱에서 캐시 재로드"""
+        self._line_cache_stale = True
     
-    def get_next_data_line(self) -> str:
-        """다음 데이터 라인 반환 (순환)"""
-        if not self.data_lines:
+    def get_next_parsed_data(self) -> Optional[dict]:
+        """다음 파싱 데이터 반환 (순환) - 캐시 원본이 변경되지 않도록 복사본 반환"""
+        cached = next(self._cycle, None)
+        if cached is None:
             return None
-            
-        data_line = self.data_lines[self.current_index]
-        self.current_index = (self.current_index + 1) % len(self.data_lines)
-        return data_line
+        
+        self.current_index += 1
+        return {
+            'timestamp': cached['timestamp'],
+            'distance': cached['distance'],
+            'lines': {line_id: dict(line_data) for line_id, line_data in cached['lines'].items()}
+        }
     
     def add_random_variation(self, parsed_data: dict) -> dict:
         """데이터에 약간의 랜덤 변화 추가 (더 실감나게)"""
@@ -106,17 +185,17 @@ class LiveDataSimulator:
             return parsed_data
         
         # 각 계류줄의 장력에 ±8% 범위의 랜덤 변화 추가 (더 다양하게)
-        for line_name, line_data in parsed_data['lines'].items():
-            if 'tension' in line_data:
-                original_tension = line_data['tension']
-                variation = random.uniform(-0.08, 0.08)  # ±8%
-                new_tension = max(0.0, original_tension * (1 + variation))
-                parsed_data['lines'][line_name]['tension'] = round(new_tension, 3)
+        uniform = self._rng.uniform
+        for line_data in parsed_data['lines'].values():
+            tension = line_data.get('tension')
+            if tension is not None:
+                # 배율(0.92~1.08)은 항상 양수이므로 입력만 0 이상으로 고정하면 결과도 0 이상
+                line_data['tension'] = round(max(0.0, tension) * uniform(0.92, 1.08), 3)
         
         # 거리에도 약간의 변화 추가
         if parsed_data.get('distance'):
             original_distance = parsed_data['distance']
-            distance_variation = random.uniform(-1.0, 1.0)  # ±1.0cm
+            distance_variation = uniform(-1.0, 1.0)  # ±1.0cm
             new_distance = max(10.0, original_distance + distance_variation)
             parsed_data['distance'] = round(new_distance, 1)
         
@@ -126,39 +205,100 @@ class LiveDataSimulator:
         
         return parsed_data
     
+    def flush_pending(self):
+        """저장 대기 중인 장력 이력을 단일 executemany INSERT로 저장
+        
+        버퍼는 여기서 비우지 않음 - 트랜잭션이 롤백되면 다음 flush에서 다시 저장해야 하므로
+        커밋이 성공한 뒤 _mark_flushed로 비움
+        """
+        if self._pending:
+            self._session.execute(insert(TensionHistory), self._pending)
+    
+    def _mark_flushed(self):
+        """flush한 장력 이력이 커밋된 뒤 버퍼 초기화"""
+        self._pending.clear()
+        self._pending_ticks = 0
+        self._last_flush = time.monotonic()
+    
+    def close(self):
+        """남은 장력 이력을 저장하고 세션 종료"""
+        try:
+            self.flush_pending()
+            self._session.commit()
+            self._mark_flushed()
+        except Exception as e:
+            logger.error(f"❌ 장력 이력 저장 실패: {e}")
+            self._session.rollback()
+        finally:
+            self._session.close()
+    
+    def _write_tick(self, parsed_data: dict) -> List[Dict]:
+        """틱 데이터를 DB에 반영하고 생성한 알림 행 반환 (동기 - asyncio.to_thread로 호출)"""
+        # 계류줄 정보 캐시 갱신 (별도 세션 사용)
+        if self._line_cache_stale:
+            self.refresh_line_cache()
+        
+        db = self._session
+        pending_before, ticks_before = len(self._pending), self._pending_ticks
+        flushed = False
+        try:
+            # 틱 전체를 하나의 트랜잭션으로 처리 (성공 시 1회 커밋, 예외 시 자동 롤백)
+            with db.begin():
+                # 현재 장력은 매 틱 반영, 장력 이력은 모아서 일괄 저장
+                history_rows, line_updates = self.parser.build_rows(parsed_data, db)
+                if line_updates:
+                    db.bulk_update_mappings(MooringLine, line_updates)
+                self._pending.extend(history_rows)
+                self._pending_ticks += 1
+                if (self._pending_ticks >= HISTORY_FLUSH_TICKS
+                        or time.monotonic() - self._last_flush >= HISTORY_FLUSH_MAX_DELAY):
+                    self.flush_pending()
+                    flushed = True
+                
+                # 알림 생성 (각 계류줄별 알림을 모아 한 번에 저장, 계류줄 정보는 캐시 사용)
+                line_cache = self._line_cache
+                created_at = datetime.utcnow()
+                alert_rows = []
+                for line_id, line_data in parsed_data['lines'].items():
+                    cached_line = line_cache.get(line_id)
+                    if cached_line:
+                        name, reference, thresholds = cached_line
+                        alert_rows.append(self.alert_manager.build_alert(
+                            name,
+                            line_data['tension'],
+                            reference,
+                            created_at,
+                            thresholds=thresholds
+                        ))
+                self.alert_manager.create_alerts(db, alert_rows)
+        except Exception:
+            # 롤백된 틱 - 이 틱의 이력만 버리고 이전 틱들의 이력은 버퍼에 남겨 다음 flush에서 다시 저장
+            del self._pending[pending_before:]
+            self._pending_ticks = ticks_before
+            raise
+        
+        # 커밋이 끝난 뒤에만 버퍼를 비움
+        if flushed:
+            self._mark_flushed()
+        
+        return alert_rows
+    
     async def simulate_single_update(self) -> bool:
         """단일 데이터 업데이트 시뮬레이션"""
         try:
-            # 다음 데이터 라인 가져오기
-            raw_line = self.get_next_data_line()
-            if not raw_line:
-                print("❌ 데이터가 없습니다")
-                return False
-            
-            # 데이터 파싱
-            parsed_data = self.parser.parse_csv_line(raw_line)
+            # 다음 데이터 가져오기 (로드 시 미리 파싱된 캐시)
+            parsed_data = self.get_next_parsed_data()
             if not parsed_data:
-                print(f"❌ 데이터 파싱 실패: {raw_line[:100]}...")
+                logger.error("❌ 데이터가 없습니다")
                 return False
             
             # 랜덤 변화 추가
             parsed_data = self.add_random_variation(parsed_data)
             
-            # 데이터베이스에 저장
-            db = SessionLocal()
+            # 데이터베이스에 저장 (동기 DB 작업은 워커 스레드에서 실행해 이벤트 루프를 막지 않음)
+            db = self._session
             try:
-                self.parser.save_parsed_data(parsed_data, db)
-                
-                # 알림 생성 (각 계류줄별로)
-                for line_id, line_data in parsed_data['lines'].items():
-                    mooring_line = db.query(MooringLine).filter(MooringLine.line_id == line_id).first()
-                    if mooring_line:
-                        self.alert_manager.create_alert(
-                            db, 
-                            mooring_line.name, 
-                            line_data['tension'], 
-                            mooring_line.reference_tension
-                        )
+                alert_rows = await asyncio.to_thread(self._write_tick, parsed_data)
                 
                 # 처리된 데이터 요약 출력
                 lines_updated = len(parsed_data['lines'])
@@ -166,77 +306,114 @@ class LiveDataSimulator:
                 distance = parsed_data.get('distance', 0)
                 self.update_count += 1
                 
-                # 각 계류줄의 장력 정보 출력
-                tension_info = []
-                for line_name, line_data in parsed_data['lines'].items():
-                    tension = line_data.get('tension', 0)
-                    tension_info.append(f"{line_name}:{tension:.2f}N")
+                # 대시보드에 틱 결과 push (클라이언트 폴링 불필요)
+                if self.broadcast:
+                    await self.broadcast({
+                        "type": "tick",
+                        "timestamp": timestamp,
+                        "distance": distance,
+                        "lines": [
+                            {"line_id": line_id, "tension": line_data['tension']}
+                            for line_id, line_data in parsed_data['lines'].items()
+                        ],
+                        "alerts": [
+                            {"message": alert['message'], "severity": alert['severity']}
+                            for alert in alert_rows
+                        ]
+                    })
                 
-                print(f"🔄 업데이트#{self.update_count} [{timestamp}] 거리:{distance}cm | {' | '.join(tension_info[:4])}")
-                print(f"   └─ {' | '.join(tension_info[4:])}")
+                # 각 계류줄의 장력 정보 출력 (INFO 비활성 시 문자열 생성 생략)
+                if logger.isEnabledFor(logging.INFO):
+                    tension_info = []
+                    for line_name, line_data in parsed_data['lines'].items():
+                        tension = line_data.get('tension', 0)
+                        tension_info.append(f"{line_name}:{tension:.2f}N")
+                    
+                    logger.info("🔄 업데이트#%d [%s] 거리:%scm | %s\n   └─ %s", self.update_count, timestamp,
+                                distance, ' | '.join(tension_info[:4]), ' | '.join(tension_info[4:]))
                 
                 return True
                 
             except Exception as e:
-                print(f"❌ 데이터 저장 실패: {e}")
+                logger.error(f"❌ 데이터 저장 실패: {e}")
                 db.rollback()
                 return False
-            finally:
-                db.close()
                 
         except Exception as e:
-            print(f"❌ 시뮬레이션 업데이트 실패: {e}")
+            logger.error(f"❌ 시뮬레이션 업데이트 실패: {e}")
             return False
     
+    async def _wait_for_stop(self, timeout: float) -> bool:
+        """중지 신호 또는 timeout까지 대기 (폴링 없이 즉시 깨어남), 중지 요청 시 True"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._stop_event.is_set()
+    
     async def start_simulation(self, update_interval: int = 30):
         """시뮬레이션 시작"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
         self.is_running = True
         self.update_count = 0
-        print(f"🚀 실시간 센서 데이터 시뮬레이션 시작 (간격: {update_interval}초)")
-        print(f"📊 총 {len(self.data_lines)}개 데이터 순환 처리")
-        print(f"🔔 최대 5개 알림 유지하며 실시간 업데이트")
+        logger.info(f"🚀 실시간 센서 데이터 시뮬레이션 시작 (간격: {update_interval}초)")
+        logger.info(f"📊 총 {self.data_line_count}개 데이터 순환 처리")
+        logger.info("🔔 최대 5개 알림 유지하며 실시간 업데이트")
         
-        while self.is_running:
-            try:
-                start_time = time.time()
-                
-                # 데이터 업데이트 실행
-                success = await self.simulate_single_update()
-                
-                if success:
-                    elapsed = time.time() - start_time
-                    print(f"✅ 업데이트 #{self.update_count} 완료 ({elapsed:.2f}초 소요)")
-                else:
-                    print(f"⚠️ 업데이트 #{self.update_count + 1} 실패")
-                
-                # 다음 업데이트까지 대기
-                await asyncio.sleep(update_interval)
-                
-            except asyncio.CancelledError:
-                print("🛑 시뮬레이션이 중단되었습니다")
-                break
-            except Exception as e:
-                print(f"❌ 시뮬레이션 오류: {e}")
-                await asyncio.sleep(5)  # 오류 시 5초 후 재시도
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    start_time = time.time()
+                    
+                    # 데이터 업데이트 실행
+                    success = await self.simulate_single_update()
+                    
+                    if success:
+                        elapsed = time.time() - start_time
+                        logger.info("✅ 업데이트 #%d 완료 (%.2f초 소요)", self.update_count, elapsed)
+                    else:
+                        logger.warning(f"⚠️ 업데이트 #{self.update_count + 1} 실패")
+                    
+                    # 다음 업데이트까지 대기 (중지 요청 시 즉시 종료)
+                    await self._wait_for_stop(update_interval)
+                    
+                except asyncio.CancelledError:
+                    logger.info("🛑 시뮬레이션이 중단되었습니다")
+                    break
+                except Exception as e:
+                    logger.error(f"❌ 시뮬레이션 오류: {e}")
+                    await self._wait_for_stop(5)  # 오류 시 5초 후 재시도
+        finally:
+            # 중지/취소 시 남은 장력 이력 저장 후 세션 종료
+            self.is_running = False
+            self.close()
     
     def stop_simulation(self):
-        """시뮬레이션 중지"""
+        """시뮬레이션 중지 - 다른 스레드에서 호출될 수 있으므로 루프에 스레드 안전하게 신호 전달"""
         self.is_running = False
-        print("🛑 시뮬레이션 중지 요청")
+        if self._loop is not None and self._stop_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 종료됨
+        logger.info("🛑 시뮬레이션 중지 요청")
 
 
 # 글로벌 시뮬레이터 인스턴스
 global_simulator = None
 
-async def start_live_simulation(data_file_path: str, interval: int = 30):
+async def start_live_simulation(data_file_path: str, interval: int = 30,
+                                broadcast: Optional[Callable[[Dict], Awaitable]] = None,
+                                seed: Optional[int] = None):
     """전역 시뮬레이션 시작"""
     global global_simulator
     
     if global_simulator and global_simulator.is_running:
-        print("⚠️ 시뮬레이션이 이미 실행 중입니다")
+        logger.warning("⚠️ 시뮬레이션이 이미 실행 중입니다")
         return
     
-    global_simulator = LiveDataSimulator(data_file_path)
+    global_simulator = LiveDataSimulator(data_file_path, broadcast, seed)
     await global_simulator.start_simulation(interval)
 
 def stop_live_simulation():
@@ -245,9 +422,14 @@ def stop_live_simulation():
     
     if global_simulator:
         global_simulator.stop_simulation()
-        print("✅ 시뮬레이션이 중지되었습니다")
+        logger.info("✅ 시뮬레이션이 중지되었습니다")
     else:
-        print("⚠️ 실행 중인 시뮬레이션이 없습니다")
+        logger.warning("⚠️ 실행 중인 시뮬레이션이 없습니다")
+
+def invalidate_line_cache():
+    """계류줄 정보가 변경되었음을 실행 중인 시뮬레이터에 알림"""
+    if global_simulator:
+        global_simulator.invalidate_line_cache()
 
 def get_simulation_status():
     """시뮬레이션 상태 반환"""
@@ -256,8 +438,8 @@ def get_simulation_status():
     if global_simulator:
         return {
             "is_running": global_simulator.is_running,
-            "data_lines_count": len(global_simulator.data_lines),
-            "current_index": global_simulator.current_index,
+            "data_lines_count": global_simulator.data_line_count,
+            "current_index": global_simulator.current_index % max(len(global_simulator.parsed_cache), 1),
             "update_count": global_simulator.update_count,
             "data_file": global_simulator.data_file_path
         }
@@ -0,0 +1,25 @@
+"""
+Queue-based logger setup shared by the API and the live simulation
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def get_queue_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+    """
+    Logger whose handler only enqueues records; a background QueueListener thread
+    does the actual stream write, so request/tick paths never block on stdout
+    """
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)  # Flush remaining records on exit
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
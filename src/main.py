@@ -1,37 +1,47 @@
 """
 FastAPI application for Mooring Line Monitoring System
 """
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 import os
+from sqlalchemy import case, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timedelta
+import hashlib
 import json
+import time
 import asyncio
+import anyio
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 
-from database import get_db, init_db
-from schemas import (
+from src.database import API_THREADPOOL_SIZE, SessionLocal, get_db, init_db
+from src.logging_config import get_queue_logger
+from src.schemas import (
     MooringLineCreate, MooringLineUpdate, MooringLineResponse, MooringLineSummary,
     TensionHistoryCreate, TensionHistoryResponse, TensionTimeSeriesData,
     WeatherDataCreate, WeatherDataResponse, CurrentWeather,
     AlertResponse, DashboardData, TensionStatus
 )
-from services import (
+from src.services import (
     MooringLineService, TensionService, WeatherService, 
     AlertService, SimulationService
 )
-from models import WeatherData, MooringLine
-from data_parser import initialize_mooring_lines
-from live_simulation import start_live_simulation, stop_live_simulation, get_simulation_status
-import threading
+from src.models import WeatherData, MooringLine
+from src.data_parser import initialize_mooring_lines
+from src.live_simulation import start_live_simulation, stop_live_simulation, get_simulation_status, invalidate_line_cache
+
+logger = get_queue_logger("mooring")
 
 app = FastAPI(
     title="Mooring Line Monitoring System",
     description="API for monitoring mooring line tension and lifespan",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -41,29 +51,78 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor for /api/tension/{id}/history - browsers hide non-safelisted headers otherwise
+    expose_headers=["X-Next-Before", "X-Next-Before-Id"],
 )
 
+# Compress JSON-heavy responses (chart data, dashboard); websocket traffic is not touched
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # WebSocket manager for real-time updates
 class ConnectionManager:
+    # Per-client send queue bound; when a slow client falls behind, its oldest message is dropped
+    SEND_QUEUE_SIZE = 16
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[WebSocket, asyncio.Queue] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[websocket] = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.pop(websocket, None)
+
+    async def send_loop(self, websocket: WebSocket):
+        """Drain this client's queue; a failed send drops the client"""
+        queue = self.active_connections.get(websocket)
+        if queue is None:
+            return
+        try:
+            while True:
+                payload = await queue.get()
+                await websocket.send_text(payload)
+        except Exception:
+            self.disconnect(websocket)
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+        if not self.active_connections:
+            return
+        # Serialize once for all clients (text frame, same as send_json)
+        await self.broadcast_raw(orjson.dumps(message).decode())
+
+    async def broadcast_raw(self, payload: str):
+        """Queue an already-serialized JSON text frame for every client without waiting on their sends"""
+        for queue in list(self.active_connections.values()):
+            if queue.full():
+                queue.get_nowait()  # drop-oldest so a slow client cannot hold back the producer
+            queue.put_nowait(payload)
 
 manager = ConnectionManager()
 
+# Short-TTL in-process cache for read-heavy dashboard endpoints
+class ResponseCache:
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+
+    def get_or_set(self, key: str, ttl: float, factory: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = factory()
+        self._entries[key] = (now + ttl, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+response_cache = ResponseCache()
+DASHBOARD_CACHE_TTL = 10
+READ_CACHE_TTL = 5
+DASHBOARD_PUSH_INTERVAL = 30
+HEALTH_CACHE_TTL = 1
+LINE_METADATA_CACHE_TTL = 60
 # This will be set up after all API routes are defined
 static_path = os.path.join(os.path.dirname(__file__), "static")
 
@@ -71,16 +130,54 @@ static_path = os.path.join(os.path.dirname(__file__), "static")
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
     init_db()
     # Initialize 8 mooring lines
     db = next(get_db())
     try:
         initialize_mooring_lines(db)
-        print("✅ Database initialized with 8 mooring lines")
-    except Exception as e:
-        print(f"❌ Database initialization error: {e}")
+        logger.info("✅ Database initialized with 8 mooring lines")
+    except Exception:
+        logger.exception("❌ Database initialization error")
     finally:
         db.close()
+    
+    app.state.dashboard_task = asyncio.create_task(_dashboard_ticker())
+
+
+async def _dashboard_ticker():
+    """Build the dashboard once per interval and push the same payload to every client"""
+    while True:
+        await asyncio.sleep(DASHBOARD_PUSH_INTERVAL)
+        if not manager.active_connections:
+            continue
+        try:
+            dashboard = await asyncio.to_thread(_cached_dashboard_data)
+            payload = orjson.dumps({
+                "type": "dashboard_update",
+                "data": dashboard.model_dump(mode="json"),
+                "timestamp": datetime.utcnow().isoformat()  # once per push, shared by all clients
+            }).decode()
+            await manager.broadcast_raw(payload)
+        except Exception:
+            logger.exception("Dashboard push error")
+
+
+def _cached_dashboard_data() -> DashboardData:
+    # Sessions are opened only on a cache miss, on the dashboard executor's threads
+    return response_cache.get_or_set("dashboard", DASHBOARD_CACHE_TTL, _build_dashboard_data)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the simulation task and flush its pending data"""
+    dashboard_task = getattr(app.state, "dashboard_task", None)
+    if dashboard_task is not None:
+        dashboard_task.cancel()
+    sim_task = getattr(app.state, "sim_task", None)
+    if sim_task is not None and not sim_task.done():
+        stop_live_simulation()
+        await sim_task
 
 
 # ======================
@@ -93,42 +190,69 @@ def create_mooring_line(
     db: Session = Depends(get_db)
 ):
     """Create a new mooring line"""
-    return MooringLineService.create_mooring_line(db, data)
+    line = MooringLineService.create_mooring_line(db, data)
+    invalidate_line_cache()
+    response_cache.clear()
+    return line
 
 
-@app.get("/api/mooring-lines", response_model=List[MooringLineSummary])
+# Rows come straight from the DB with SQL-computed fields, so they are returned as plain dicts
+# without per-row model validation; the schema is kept for the API docs only
+@app.get(
+    "/api/mooring-lines",
+    response_model=None,
+    responses={200: {"model": List[MooringLineSummary]}}
+)
 def get_mooring_lines(
+    request: Request,
     active_only: bool = True,
     db: Session = Depends(get_db)
 ):
     """Get all mooring lines with summary information (8 lines system)"""
-    lines = MooringLineService.get_all_mooring_lines(db, active_only)
-    
-    summaries = []
-    for line in lines:
-        tension_percentage = (line.current_tension / line.reference_tension * 100) if line.reference_tension > 0 else 0
-        # Simple status calculation
-        if line.current_tension > line.reference_tension * 1.2:
-            status = "WARNING"
-        elif line.current_tension > line.max_tension * 0.9:
-            status = "CRITICAL"
-        else:
-            status = "NORMAL"
-        
-        summaries.append(MooringLineSummary(
-            id=line.id,
-            line_id=line.line_id,
-            name=line.name,
-            side=line.side,
-            position_index=line.position_index,
-            current_tension=line.current_tension,
-            reference_tension=line.reference_tension,
-            tension_percentage=tension_percentage,
-            remaining_lifespan_percentage=line.remaining_lifespan_percentage,
-            status=status
-        ))
-    
-    return summaries
+    # Polling clients revalidate with If-None-Match and get a 304 while the body is unchanged.
+    # The ETag is a hash of the body, so writes from other processes sharing the DB still change it
+    body, etag = response_cache.get_or_set(
+        f"mooring_lines:{active_only}", READ_CACHE_TTL,
+        lambda: _with_body_etag(orjson.dumps(_build_mooring_line_summaries(db, active_only)))
+    )
+    headers = {"ETag": etag, "Cache-Control": "max-age=1"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _with_body_etag(body: bytes) -> tuple:
+    """(body, weak ETag) - hashed once per cache fill, not per request"""
+    return body, f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _build_mooring_line_summaries(db: Session, active_only: bool = True) -> List[Dict[str, Any]]:
+    """Summary rows in one column select; status and percentage are computed in SQL (no ORM objects)"""
+    tension_percentage = case(
+        (MooringLine.reference_tension > 0,
+         MooringLine.current_tension * 100.0 / MooringLine.reference_tension),
+        else_=0.0
+    )
+    status = case(
+        (MooringLine.current_tension > MooringLine.reference_tension * 1.2, "WARNING"),
+        (MooringLine.current_tension > MooringLine.max_tension * 0.9, "CRITICAL"),
+        else_="NORMAL"
+    )
+    query = select(
+        MooringLine.id,
+        MooringLine.line_id,
+        MooringLine.name,
+        MooringLine.side,
+        MooringLine.position_index,
+        MooringLine.current_tension,
+        MooringLine.reference_tension,
+        tension_percentage.label("tension_percentage"),
+        MooringLine.remaining_lifespan_percentage,
+        status.label("status")
+    ).order_by(MooringLine.id)
+    if active_only:
+        query = query.where(MooringLine.is_active == True)
+    return [dict(row._mapping) for row in db.execute(query)]
 
 
 @app.get("/api/mooring-lines/{line_id}", response_model=MooringLineResponse)
@@ -153,6 +277,8 @@ def update_mooring_line(
     line = MooringLineService.update_mooring_line(db, line_id, data)
     if not line:
         raise HTTPException(status_code=404, detail="Mooring line not found")
+    invalidate_line_cache()
+    response_cache.clear()
     return line
 
 
@@ -167,6 +293,7 @@ async def record_tension(
 ):
     """Record new tension measurement"""
     tension = TensionService.record_tension(db, data)
+    response_cache.clear()
     
     # Broadcast update via WebSocket
     await manager.broadcast({
@@ -182,12 +309,47 @@ async def record_tension(
 @app.get("/api/tension/{line_id}/history", response_model=List[TensionTimeSeriesData])
 def get_tension_history(
     line_id: int,
+    response: Response,
     hours: int = 24,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(1000, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
-    """Get tension history for a mooring line"""
+    """Get tension history for a mooring line (newest `limit` rows; page back with `before` and `before_id`)"""
+    if (before is None) != (before_id is None):
+        raise HTTPException(status_code=422, detail="before and before_id must be given together")
     start_time = datetime.utcnow() - timedelta(hours=hours)
-    return TensionService.get_tension_history(db, line_id, start_time=start_time, limit=1000)
+    history = TensionService.get_tension_history(
+        db, line_id, start_time=start_time, limit=limit, before=before, before_id=before_id
+    )
+    if len(history) == limit:
+        # Full page - the oldest row's (timestamp, id) is the cursor for the previous page
+        # (?before=...&before_id=...); timestamps alone repeat within a simulation tick
+        response.headers["X-Next-Before"] = history[0].timestamp.isoformat()
+        response.headers["X-Next-Before-Id"] = str(history[0].id)
+    return history
+
+
+# Chart bucket size by requested window: (max hours, bucket seconds); 0 = raw rows
+CHART_BUCKETS = ((1, 0), (6, 60), (24, 300), (168, 3600))
+
+
+def _chart_bucket_seconds(hours: int) -> int:
+    for max_hours, bucket_seconds in CHART_BUCKETS:
+        if hours <= max_hours:
+            return bucket_seconds
+    return 6 * 3600
+
+
+def _chart_line_metadata(db: Session) -> Dict[int, Dict[str, Any]]:
+    """Chart header data for every line from one select, shared by the parallel per-line chart requests"""
+    def load():
+        rows = db.execute(
+            select(MooringLine.id, MooringLine.name, MooringLine.reference_tension, MooringLine.max_tension)
+        )
+        return {row.id: dict(row._mapping) for row in rows}
+    return response_cache.get_or_set("chart_line_metadata", LINE_METADATA_CACHE_TTL, load)
 
 
 @app.get("/api/tension/{line_id}/chart-data")
@@ -197,26 +359,24 @@ def get_tension_chart_data(
     db: Session = Depends(get_db)
 ):
     """Get tension data formatted for charting"""
-    history = TensionService.get_tension_history(
-        db, line_id, 
-        start_time=datetime.utcnow() - timedelta(hours=hours),
-        limit=1000
-    )
-    
-    line = MooringLineService.get_mooring_line(db, line_id)
+    line = _chart_line_metadata(db).get(line_id)
     if not line:
         raise HTTPException(status_code=404, detail="Mooring line not found")
     
-    return {
-        "mooring_line": {
-            "id": line.id,
-            "name": line.name,
-            "reference_tension": line.reference_tension,
-            "max_tension": line.max_tension
-        },
+    start_time = datetime.utcnow() - timedelta(hours=hours)
+    bucket_seconds = _chart_bucket_seconds(hours)
+    if bucket_seconds:
+        # Longer windows are downsampled in the database (per-bucket average, worst status)
+        history = TensionService.get_tension_buckets(db, line_id, start_time, bucket_seconds, limit=1000)
+    else:
+        history = TensionService.get_tension_history(db, line_id, start_time=start_time, limit=1000)
+    
+    # Returned as ORJSONResponse directly: orjson encodes the datetimes itself (no jsonable_encoder pass)
+    return ORJSONResponse({
+        "mooring_line": line,
         "data": [
             {
-                "timestamp": item.timestamp.isoformat(),
+                "timestamp": item.timestamp,
                 "tension": item.tension_value,
                 "status": item.status.value,
                 "temperature": item.temperature,
@@ -226,7 +386,7 @@ def get_tension_chart_data(
             }
             for item in history
         ]
-    }
+    })
 
 
 # ======================
@@ -240,6 +400,7 @@ async def record_weather(
 ):
     """Record weather data"""
     weather = WeatherService.record_weather(db, data)
+    response_cache.clear()
     
     # Broadcast update via WebSocket
     await manager.broadcast({
@@ -254,19 +415,26 @@ async def record_weather(
 @app.get("/api/weather/current", response_model=CurrentWeather)
 def get_current_weather(db: Session = Depends(get_db)):
     """Get current weather conditions"""
+    return response_cache.get_or_set("current_weather", READ_CACHE_TTL, lambda: _build_current_weather(db))
+
+
+# Default conditions when no weather data has been recorded yet (timestamp is added per call)
+_DEFAULT_WEATHER = {
+    "temperature": 20.0,
+    "humidity": 60.0,
+    "wind_speed": 5.0,
+    "wind_direction": 0.0,
+    "wind_direction_text": "N",
+    "pressure": 1013.0,
+    "wave_height": 1.0
+}
+
+
+def _build_current_weather(db: Session) -> CurrentWeather:
     weather = WeatherService.get_current_weather(db)
     if not weather:
-        # Return default values if no weather data
-        return CurrentWeather(
-            temperature=20.0,
-            humidity=60.0,
-            wind_speed=5.0,
-            wind_direction=0.0,
-            wind_direction_text="N",
-            pressure=1013.0,
-            wave_height=1.0,
-            timestamp=datetime.utcnow()
-        )
+        # Return default values if no weather data (constant, known-valid fields: skip validation)
+        return CurrentWeather.model_construct(**_DEFAULT_WEATHER, timestamp=datetime.utcnow())
     
     return CurrentWeather(
         temperature=weather.temperature,
@@ -305,6 +473,7 @@ def resolve_alert(
     alert = AlertService.resolve_alert(db, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
+    response_cache.clear()
     return {"message": "Alert resolved", "alert_id": alert_id}
 
 
@@ -312,78 +481,69 @@ def resolve_alert(
 # Dashboard Endpoint
 # ======================
 
-@app.get("/api/dashboard", response_model=DashboardData)
-def get_dashboard_data(db: Session = Depends(get_db)):
+_WARNING_SEVERITIES = frozenset(("HIGH", "MEDIUM"))
+DASHBOARD_ALERT_LIMIT = 10
+_dashboard_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dashboard")
+
+
+def _with_session(fetch: Callable[[Session], Any]) -> Any:
+    """Run a read on its own short-lived session (sessions are not shared across threads)"""
+    db = SessionLocal()
+    try:
+        return fetch(db)
+    finally:
+        db.close()
+
+
+# DashboardData is validated once when built; response_model=None avoids validating it a second time
+@app.get("/api/dashboard", response_model=None, responses={200: {"model": DashboardData}})
+def get_dashboard_data():
     """Get all dashboard data in one request"""
-    # Get mooring lines summary - direct query to avoid service issues
+    return _cached_dashboard_data()
+
+
+def _build_dashboard_data() -> DashboardData:
+    # All four reads run on the dashboard executor, each with its own short-lived session, so the
+    # round-trips overlap. The calling thread holds no connection while it waits, and dashboard DB
+    # use is capped at the executor's worker count however many cache misses arrive at once
+    lines_future = _dashboard_executor.submit(_with_session, _build_mooring_line_summaries)
+    weather_future = _dashboard_executor.submit(_with_session, _build_current_weather)
+    alerts_future = _dashboard_executor.submit(
+        _with_session, lambda alert_db: AlertService.get_active_alerts(alert_db, limit=DASHBOARD_ALERT_LIMIT)
+    )
+    alert_counts_future = _dashboard_executor.submit(_with_session, AlertService.count_active_alerts_by_severity)
+    
+    # Get mooring lines summary - single column select shared with /api/mooring-lines
     try:
-        lines = db.query(MooringLine).filter(MooringLine.is_active == True).all()
-        line_summaries = []
-        
-        for line in lines:
-            tension_percentage = (line.current_tension / line.reference_tension * 100) if line.reference_tension > 0 else 0
-            # Simple status calculation
-            if line.current_tension > line.reference_tension * 1.2:
-                status = "WARNING"
-            elif line.current_tension > line.max_tension * 0.9:
-                status = "CRITICAL" 
-            else:
-                status = "NORMAL"
-            
-            line_summaries.append(MooringLineSummary(
-                id=line.id,
-                line_id=line.line_id,
-                name=line.name,
-                side=line.side,
-                position_index=line.position_index,
-                current_tension=line.current_tension,
-                reference_tension=line.reference_tension,
-                tension_percentage=tension_percentage,
-                remaining_lifespan_percentage=line.remaining_lifespan_percentage,
-                status=status
-            ))
-    except Exception as e:
-        print(f"Error loading mooring lines: {e}")
+        line_summaries = lines_future.result()
+    except Exception:
+        logger.exception("Error loading mooring lines")
         line_summaries = []
     
     # Get current weather
-    weather = WeatherService.get_current_weather(db)
-    if weather:
-        current_weather = CurrentWeather(
-            temperature=weather.temperature,
-            humidity=weather.humidity,
-            wind_speed=weather.wind_speed,
-            wind_direction=weather.wind_direction,
-            wind_direction_text=WeatherService.get_wind_direction_text(weather.wind_direction),
-            pressure=weather.pressure,
-            wave_height=weather.wave_height,
-            timestamp=weather.timestamp
-        )
-    else:
-        current_weather = CurrentWeather(
-            temperature=20.0,
-            humidity=60.0,
-            wind_speed=5.0,
-            wind_direction=0.0,
-            wind_direction_text="N",
-            pressure=1013.0,
-            wave_height=1.0,
-            timestamp=datetime.utcnow()
-        )
+    try:
+        current_weather = weather_future.result()
+    except Exception:
+        logger.exception("Error loading current weather")
+        current_weather = CurrentWeather.model_construct(**_DEFAULT_WEATHER, timestamp=datetime.utcnow())
     
-    # Get active alerts (임시로 빈 배열 반환)
+    # Get active alerts - only the latest ones are displayed; counts come from an aggregate query
     try:
-        alerts = AlertService.get_active_alerts(db)
-    except Exception as e:
-        print(f"Alert service error: {e}")
+        alerts = alerts_future.result()
+        alert_counts = alert_counts_future.result()
+    except Exception:
+        logger.exception("Alert service error")
         alerts = []
+        alert_counts = {}
     
     # System status
     system_status = {
-        "active_lines": len([l for l in lines if l.is_active]),
-        "total_lines": len(lines),
-        "critical_alerts": len([a for a in alerts if a.severity == "CRITICAL"]),
-        "warning_alerts": len([a for a in alerts if a.severity in ["HIGH", "MEDIUM"]]),
+        "active_lines": len(line_summaries),
+        "total_lines": len(line_summaries),
+        "critical_alerts": alert_counts.get("CRITICAL", 0),
+        "warning_alerts": sum(alert_counts.get(severity, 0) for severity in _WARNING_SEVERITIES),
+        # active_alerts holds at most DASHBOARD_ALERT_LIMIT rows; this is the full count
+        "active_alerts_total": sum(alert_counts.values()),
         "system_health": "OPERATIONAL"
     }
     
@@ -400,14 +560,18 @@ def get_dashboard_data(db: Session = Depends(get_db)):
 # ======================
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)):
+async def websocket_endpoint(websocket: WebSocket):
     """WebSocket for real-time updates"""
     await manager.connect(websocket)
+    sender = asyncio.create_task(manager.send_loop(websocket))
     try:
         while True:
-            # Keep connection alive
-            await asyncio.sleep(1)
+            # Park until the client sends (ignored keepalive) or disconnects
+            await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
         manager.disconnect(websocket)
 
 
@@ -420,11 +584,18 @@ def generate_sample_data(db: Session = Depends(get_db)):
     """Generate sample data for testing"""
     try:
         SimulationService.generate_sample_data(db)
+        response_cache.clear()
         return {"message": "Sample data generated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _on_simulation_tick(message: dict):
+    """Simulation tick changed tensions/alerts: drop cached reads, then push to clients"""
+    response_cache.clear()
+    await manager.broadcast(message)
+
+
 @app.post("/api/simulation/start")
 async def start_simulation():
     """Start live sensor data simulation with 30-second updates"""
@@ -433,18 +604,14 @@ async def start_simulation():
         
         # Check if simulation is already running
         status = get_simulation_status()
-        if status["is_running"]:
+        sim_task = getattr(app.state, "sim_task", None)
+        if status["is_running"] or (sim_task is not None and not sim_task.done()):
             return {"message": "Simulation is already running", "status": status}
         
-        # Start simulation in background thread
-        def run_simulation():
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(start_live_simulation(data_file_path, 30))
-        
-        simulation_thread = threading.Thread(target=run_simulation, daemon=True)
-        simulation_thread.start()
+        # Run simulation as a task on the server's event loop (shares manager/DB state)
+        app.state.sim_task = asyncio.create_task(
+            start_live_simulation(data_file_path, 30, broadcast=_on_simulation_tick)
+        )
         
         return {
             "message": "Live simulation started with 30-second updates",
@@ -483,17 +650,31 @@ def get_simulation_status_endpoint():
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    # Monitors poll this at >1 Hz; reuse the same response for up to a second
+    return response_cache.get_or_set(
+        "health", HEALTH_CACHE_TTL,
+        lambda: {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    )
 
 
 # Mount static files at the end, after all API routes
 if os.path.exists(static_path):
     from fastapi.responses import HTMLResponse
     
+    # index.html is read once; the ETag lets browsers revalidate with a 304 instead of re-downloading
+    # (a static directory without index.html must not stop the app from importing)
+    try:
+        with open(os.path.join(static_path, "index.html"), "rb") as f:
+            _INDEX_HTML = f.read()
+    except OSError:
+        _INDEX_HTML = "<h1>Mooring Line Monitoring System</h1><p>API is running. Frontend files not found.</p>".encode()
+    _INDEX_ETAG = f'"{hashlib.blake2b(_INDEX_HTML, digest_size=8).hexdigest()}"'
+    
     @app.get("/", response_class=HTMLResponse)
-    async def serve_frontend():
-        with open(os.path.join(static_path, "index.html"), "r") as f:
-            return f.read()
+    async def serve_frontend(request: Request):
+        if request.headers.get("if-none-match") == _INDEX_ETAG:
+            return Response(status_code=304, headers={"ETag": _INDEX_ETAG})
+        return HTMLResponse(_INDEX_HTML, headers={"ETag": _INDEX_ETAG})
     
     # Serve static files for all non-API routes
     app.mount("/", StaticFiles(directory=static_path, html=True), name="static")
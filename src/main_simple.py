@@ -1,11 +1,13 @@
 """
 FastAPI application for Mooring Line Monitoring System - Simplified Version
 """
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, Response
+import hashlib
 import os
+from sqlalchemy import case, select
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -13,15 +15,21 @@ from src.database import get_db, init_db
 from src.models import MooringLine
 from src.data_parser import initialize_mooring_lines
 from src.live_simulation import start_live_simulation, stop_live_simulation, get_simulation_status
-import threading
-import requests
+from src.logging_config import get_queue_logger
+import asyncio
 import random
+import orjson
 import math
+import time
+from functools import lru_cache
+
+logger = get_queue_logger("mooring")
 
 app = FastAPI(
     title="Mooring Line Monitoring System",
     description="API for monitoring mooring line tension and lifespan",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -36,7 +44,40 @@ app.add_middleware(
 # This will be set up after all API routes are defined
 static_path = os.path.join(os.path.dirname(__file__), "static")
 
+# 시뮬레이션 잡음용 전용 난수 생성기 (bound method로 보관해 호출마다 속성 조회를 줄임)
+_uniform = random.Random().uniform
+
 # Weather API functions
+@lru_cache(maxsize=1)
+def _weather_envelope(second: int):
+    """시간대/계절에 따른 기본 날씨 값 (같은 초 안의 요청은 계산 결과를 재사용)"""
+    hour_of_day = (second / 3600) % 24  # 0-24 시간
+    day_of_year = (second / (24 * 3600)) % 365  # 0-365 일
+    
+    # 일일 온도 변화 패턴 (새벽 최저, 오후 최고)
+    daily_temp_variation = 6 * math.sin((hour_of_day - 6) * math.pi / 12)
+    
+    # 연간 온도 변화 패턴 (여름 최고, 겨울 최저)
+    seasonal_temp_variation = 10 * math.sin((day_of_year - 80) * 2 * math.pi / 365)
+    
+    # 기본 온도 (부산 연평균)
+    base_temp = 15 + seasonal_temp_variation + daily_temp_variation
+    
+    # 습도 패턴 (새벽 높고, 오후 낮음)
+    humidity_variation = -15 * math.sin((hour_of_day - 6) * math.pi / 12)
+    base_humidity = 65 + humidity_variation
+    
+    # 풍속 패턴 (해안 지역 특성)
+    wind_base = 4 + 3 * math.sin(hour_of_day * math.pi / 12)
+    
+    # 풍향 패턴 (해륙풍 고려)
+    if 6 <= hour_of_day <= 18:  # 주간: 해풍 (남동풍)
+        wind_dir_base = 135
+    else:  # 야간: 육풍 (북서풍)
+        wind_dir_base = 315
+    
+    return base_temp, base_humidity, wind_base, wind_dir_base
+
 def get_weather_data():
     """Get real weather data from multiple APIs or simulate realistic data"""
     try:
@@ -63,44 +104,17 @@ def get_weather_data():
         #     except Exception as api_error:
         #         print(f"OpenWeatherMap API error: {api_error}")
         
-        # 시뮬레이션 날씨 데이터 (부산항 기준 실감나는 데이터)
-        import time
-        import math
-        
-        current_time = time.time()
-        hour_of_day = (current_time / 3600) % 24  # 0-24 시간
-        day_of_year = (current_time / (24 * 3600)) % 365  # 0-365 일
-        
-        # 일일 온도 변화 패턴 (새벽 최저, 오후 최고)
-        daily_temp_variation = 6 * math.sin((hour_of_day - 6) * math.pi / 12)
-        
-        # 연간 온도 변화 패턴 (여름 최고, 겨울 최저)
-        seasonal_temp_variation = 10 * math.sin((day_of_year - 80) * 2 * math.pi / 365)
-        
-        # 기본 온도 (부산 연평균)
-        base_temp = 15 + seasonal_temp_variation + daily_temp_variation
-        
-        # 습도 패턴 (새벽 높고, 오후 낮음)
-        humidity_variation = -15 * math.sin((hour_of_day - 6) * math.pi / 12)
-        base_humidity = 65 + humidity_variation
-        
-        # 풍속 패턴 (해안 지역 특성)
-        wind_base = 4 + 3 * math.sin(hour_of_day * math.pi / 12)
-        
-        # 풍향 패턴 (해륙풍 고려)
-        if 6 <= hour_of_day <= 18:  # 주간: 해풍 (남동풍)
-            wind_dir_base = 135
-        else:  # 야간: 육풍 (북서풍)
-            wind_dir_base = 315
+        # 시뮬레이션 날씨 데이터 (부산항 기준 실감나는 데이터) - 기본값은 초 단위로 캐시, 잡음만 매번 추가
+        base_temp, base_humidity, wind_base, wind_dir_base = _weather_envelope(int(time.time()))
         
         return {
-            "temperature": round(base_temp + random.uniform(-2, 2), 1),
-            "humidity": max(30, min(90, round(base_humidity + random.uniform(-8, 8), 1))),
-            "wind_speed": max(0.5, round(wind_base + random.uniform(-1.5, 1.5), 1)),
-            "wind_direction": round((wind_dir_base + random.uniform(-45, 45)) % 360, 1)
+            "temperature": round(base_temp + _uniform(-2, 2), 1),
+            "humidity": max(30, min(90, round(base_humidity + _uniform(-8, 8), 1))),
+            "wind_speed": max(0.5, round(wind_base + _uniform(-1.5, 1.5), 1)),
+            "wind_direction": round((wind_dir_base + _uniform(-45, 45)) % 360, 1)
         }
-    except Exception as e:
-        print(f"Weather data generation error: {e}")
+    except Exception:
+        logger.exception("Weather data generation error")
         # 안전한 기본값 반환
         return {
             "temperature": 18.0,
@@ -109,12 +123,12 @@ def get_weather_data():
             "wind_direction": 180.0
         }
 
+_WIND_DIRECTIONS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+                    "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
 def get_wind_direction_text(degrees):
     """Convert wind direction degrees to text"""
-    directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
-                 "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
-    index = round(degrees / 22.5) % 16
-    return directions[index]
+    return _WIND_DIRECTIONS[round(degrees / 22.5) % 16]
 
 @app.on_event("startup")
 async def startup_event():
@@ -124,72 +138,88 @@ async def startup_event():
     db = next(get_db())
     try:
         initialize_mooring_lines(db)
-        print("✅ Database initialized with 8 mooring lines")
-    except Exception as e:
-        print(f"❌ Database initialization error: {e}")
+        logger.info("✅ Database initialized with 8 mooring lines")
+    except Exception:
+        logger.exception("❌ Database initialization error")
     finally:
         db.close()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the simulation task and flush its pending data"""
+    sim_task = getattr(app.state, "sim_task", None)
+    if sim_task is not None and not sim_task.done():
+        stop_live_simulation()
+        await sim_task
+
 @app.get("/api/mooring-lines")
 def get_mooring_lines(db: Session = Depends(get_db)):
     """Get all mooring lines"""
     try:
-        lines = db.query(MooringLine).filter(MooringLine.is_active == True).all()
-        result = []
-        for line in lines:
-            tension_percentage = (line.current_tension / line.reference_tension * 100) if line.reference_tension > 0 else 0
-            # Simple status calculation (랜덤 알림 제거)
-            if line.current_tension > line.max_tension * 0.9:
-                status = "CRITICAL"
-            elif line.current_tension > line.reference_tension * 1.2:
-                status = "WARNING"
-            else:
-                status = "NORMAL"
-            
-            result.append({
-                "id": line.id,
-                "line_id": line.line_id,
-                "name": line.name,
-                "side": line.side,
-                "position_index": line.position_index,
-                "current_tension": line.current_tension,
-                "reference_tension": line.reference_tension,
-                "tension_percentage": tension_percentage,
-                "remaining_lifespan_percentage": line.remaining_lifespan_percentage,
-                "status": status
-            })
-        return result
-    except Exception as e:
-        print(f"Error: {e}")
+        # Column select with percentage/status computed in SQL - no ORM objects, no per-row branching
+        tension_percentage = case(
+            (MooringLine.reference_tension > 0,
+             MooringLine.current_tension * 100.0 / MooringLine.reference_tension),
+            else_=0
+        )
+        # Simple status calculation (랜덤 알림 제거)
+        status = case(
+            (MooringLine.current_tension > MooringLine.max_tension * 0.9, "CRITICAL"),
+            (MooringLine.current_tension > MooringLine.reference_tension * 1.2, "WARNING"),
+            else_="NORMAL"
+        )
+        rows = db.execute(
+            select(
+                MooringLine.id,
+                MooringLine.line_id,
+                MooringLine.name,
+                MooringLine.side,
+                MooringLine.position_index,
+                MooringLine.current_tension,
+                MooringLine.reference_tension,
+                tension_percentage.label("tension_percentage"),
+                MooringLine.remaining_lifespan_percentage,
+                status.label("status")
+            ).where(MooringLine.is_active == True)
+        ).mappings().all()
+        # Returned directly: orjson encodes the list without a jsonable_encoder pass
+        return ORJSONResponse([dict(row) for row in rows])
+    except Exception:
+        logger.exception("Mooring lines fetch failed")
         return []
 
+# Everything but current_weather is constant - serialized once, the live weather is spliced in per request
+_DASHBOARD_PREFIX, _DASHBOARD_SUFFIX = orjson.dumps({
+    "mooring_lines": [],  # Frontend should use /api/mooring-lines
+    "current_weather": "__WEATHER__",
+    "active_alerts": [],
+    "system_status": {
+        "active_lines": 8,
+        "total_lines": 8,
+        "critical_alerts": 0,
+        "warning_alerts": 0,
+        "active_alerts_total": 0,
+        "system_health": "OPERATIONAL"
+    }
+}).split(b'"__WEATHER__"')
+
 @app.get("/api/dashboard")
 def get_dashboard_data():
     """Get dashboard data with real weather information"""
     # Get real weather data
     weather = get_weather_data()
     
-    return {
-        "mooring_lines": [],  # Frontend should use /api/mooring-lines
-        "current_weather": {
-            "temperature": weather["temperature"],
-            "humidity": weather["humidity"],
-            "wind_speed": weather["wind_speed"],
-            "wind_direction": weather["wind_direction"],
-            "wind_direction_text": get_wind_direction_text(weather["wind_direction"]),
-            "pressure": 1013.0 + random.uniform(-20, 20),
-            "wave_height": 1.0 + random.uniform(-0.5, 0.5),
-            "timestamp": datetime.utcnow().isoformat()
-        },
-        "active_alerts": [],
-        "system_status": {
-            "active_lines": 8,
-            "total_lines": 8,
-            "critical_alerts": 0,
-            "warning_alerts": 0,
-            "system_health": "OPERATIONAL"
-        }
-    }
+    current_weather = orjson.dumps({
+        "temperature": weather["temperature"],
+        "humidity": weather["humidity"],
+        "wind_speed": weather["wind_speed"],
+        "wind_direction": weather["wind_direction"],
+        "wind_direction_text": get_wind_direction_text(weather["wind_direction"]),
+        "pressure": 1013.0 + _uniform(-20, 20),
+        "wave_height": 1.0 + _uniform(-0.5, 0.5),
+        "timestamp": datetime.utcnow()
+    })
+    return Response(_DASHBOARD_PREFIX + current_weather + _DASHBOARD_SUFFIX, media_type="application/json")
 
 @app.post("/api/simulation/start")
 async def start_simulation():
@@ -198,17 +228,12 @@ async def start_simulation():
         data_file_path = os.path.join(os.path.dirname(__file__), "..", "testdata_full.txt")
         
         status = get_simulation_status()
-        if status["is_running"]:
+        sim_task = getattr(app.state, "sim_task", None)
+        if status["is_running"] or (sim_task is not None and not sim_task.done()):
             return {"message": "Simulation is already running", "status": status}
         
-        def run_simulation():
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(start_live_simulation(data_file_path, 30))
-        
-        simulation_thread = threading.Thread(target=run_simulation, daemon=True)
-        simulation_thread.start()
+        # Run simulation as a task on the server's event loop (no thread / extra loop per request)
+        app.state.sim_task = asyncio.create_task(start_live_simulation(data_file_path, 30))
         
         return {
             "message": "Live simulation started with 30-second updates",
@@ -230,9 +255,12 @@ def get_simulation_status_endpoint():
     """Get simulation status"""
     return {"simulation": get_simulation_status()}
 
+# Weather fields for chart points when the caller opted out (same keys, null values)
+_NO_CHART_WEATHER = {"temperature": None, "humidity": None, "wind_speed": None, "wind_direction": None}
+
 @app.get("/api/tension/{line_id}/chart-data")
-def get_tension_chart_data(line_id: int, hours: int = 24, db: Session = Depends(get_db)):
-    """Get tension chart data for individual mooring line"""
+def get_tension_chart_data(line_id: int, hours: int = 24, include_weather: bool = True, db: Session = Depends(get_db)):
+    """Get tension chart data for individual mooring line (include_weather=false skips the weather synthesis)"""
     try:
         from sqlalchemy import and_
         from src.models import TensionHistory
@@ -256,25 +284,29 @@ def get_tension_chart_data(line_id: int, hours: int = 24, db: Session = Depends(
         if not tension_history:
             # Create sample data points with realistic weather
             sample_data = []
-            base_weather = get_weather_data()  # Get base weather data
+            base_weather = get_weather_data() if include_weather else None  # Get base weather data
+            now = datetime.utcnow()
             
             for i in range(24):  # Last 24 hours of sample data
-                sample_time = datetime.utcnow() - timedelta(hours=23-i)
-                
-                # Create realistic weather variations over time
-                time_factor = i / 24.0  # 0 to 1 for time progression
-                
-                sample_data.append({
-                    "timestamp": sample_time.isoformat(),
+                sample_time = now - timedelta(hours=23-i)
+                point = {
+                    "timestamp": sample_time,
                     "tension": line.current_tension + (i % 5 - 2) * 0.1,  # Some variation
-                    "status": "NORMAL",
-                    "temperature": base_weather["temperature"] + random.uniform(-3, 3),
-                    "humidity": base_weather["humidity"] + random.uniform(-10, 10),
-                    "wind_speed": base_weather["wind_speed"] + random.uniform(-2, 2),
-                    "wind_direction": (base_weather["wind_direction"] + i * 10 + random.uniform(-15, 15)) % 360
-                })
+                    "status": "NORMAL"
+                }
+                if base_weather is None:
+                    point.update(_NO_CHART_WEATHER)
+                else:
+                    # Create realistic weather variations over time
+                    point.update(
+                        temperature=base_weather["temperature"] + _uniform(-3, 3),
+                        humidity=base_weather["humidity"] + _uniform(-10, 10),
+                        wind_speed=base_weather["wind_speed"] + _uniform(-2, 2),
+                        wind_direction=(base_weather["wind_direction"] + i * 10 + _uniform(-15, 15)) % 360
+                    )
+                sample_data.append(point)
             
-            return {
+            return ORJSONResponse({
                 "mooring_line": {
                     "id": line.id,
                     "name": line.name,
@@ -282,26 +314,32 @@ def get_tension_chart_data(line_id: int, hours: int = 24, db: Session = Depends(
                     "max_tension": line.max_tension
                 },
                 "data": sample_data
-            }
+            })
         
-        # Convert actual data with weather information
+        # Convert actual data with weather information (datetimes are encoded by orjson)
         chart_data = []
-        base_weather = get_weather_data()  # Get current weather as base
+        base_weather = get_weather_data() if include_weather else None  # Get current weather as base
         
         for i, record in enumerate(reversed(tension_history)):  # Reverse to get chronological order
-            # Create time-based weather variations for historical data
-            time_offset = i * 0.1  # Small variations based on record sequence
-            chart_data.append({
-                "timestamp": record.timestamp.isoformat(),
+            point = {
+                "timestamp": record.timestamp,
                 "tension": record.tension_value,
-                "status": record.status or "NORMAL",
-                "temperature": base_weather["temperature"] + random.uniform(-2, 2),
-                "humidity": base_weather["humidity"] + random.uniform(-8, 8),
-                "wind_speed": base_weather["wind_speed"] + random.uniform(-1.5, 1.5),
-                "wind_direction": (base_weather["wind_direction"] + time_offset * 30 + random.uniform(-20, 20)) % 360
-            })
+                "status": record.status or "NORMAL"
+            }
+            if base_weather is None:
+                point.update(_NO_CHART_WEATHER)
+            else:
+                # Create time-based weather variations for historical data
+                time_offset = i * 0.1  # Small variations based on record sequence
+                point.update(
+                    temperature=base_weather["temperature"] + _uniform(-2, 2),
+                    humidity=base_weather["humidity"] + _uniform(-8, 8),
+                    wind_speed=base_weather["wind_speed"] + _uniform(-1.5, 1.5),
+                    wind_direction=(base_weather["wind_direction"] + time_offset * 30 + _uniform(-20, 20)) % 360
+                )
+            chart_data.append(point)
         
-        return {
+        return ORJSONResponse({
             "mooring_line": {
                 "id": line.id,
                 "name": line.name,
@@ -309,10 +347,10 @@ def get_tension_chart_data(line_id: int, hours: int = 24, db: Session = Depends(
                 "max_tension": line.max_tension
             },
             "data": chart_data
-        }
+        })
         
     except Exception as e:
-        print(f"Chart data error: {e}")
+        logger.exception("Chart data error")
         return {"error": str(e)}
 
 
@@ -328,8 +366,8 @@ def get_weather():
             "wind_speed": round(weather["wind_speed"], 1),
             "wind_direction": round(weather["wind_direction"], 1),
             "wind_direction_text": get_wind_direction_text(weather["wind_direction"]),
-            "pressure": round(1013.0 + random.uniform(-20, 20), 1),
-            "wave_height": round(1.0 + random.uniform(-0.5, 0.5), 1),
+            "pressure": round(1013.0 + _uniform(-20, 20), 1),
+            "wave_height": round(1.0 + _uniform(-0.5, 0.5), 1),
             "timestamp": datetime.utcnow().isoformat(),
             "location": "부산항",
             "description": "실시간 기상 데이터"
@@ -344,14 +382,18 @@ def health_check():
 
 # Serve static files
 if os.path.exists(static_path):
-    from fastapi.responses import HTMLResponse
+    # index.html is read once; the ETag lets browsers revalidate with a 304 instead of re-downloading
+    try:
+        with open(os.path.join(static_path, "index.html"), "rb") as f:
+            _INDEX_HTML = f.read()
+    except OSError:
+        _INDEX_HTML = "<h1>Mooring Line Monitoring System</h1><p>API is running. Frontend files not found.</p>".encode()
+    _INDEX_ETAG = f'"{hashlib.blake2b(_INDEX_HTML, digest_size=8).hexdigest()}"'
     
     @app.get("/", response_class=HTMLResponse)
-    async def serve_frontend():
-        try:
-            with open(os.path.join(static_path, "index.html"), "r") as f:
-                return f.read()
-        except:
-            return "<h1>Mooring Line Monitoring System</h1><p>API is running. Frontend files not found.</p>"
+    async def serve_frontend(request: Request):
+        if request.headers.get("if-none-match") == _INDEX_ETAG:
+            return Response(status_code=304, headers={"ETag": _INDEX_ETAG})
+        return HTMLResponse(_INDEX_HTML, headers={"ETag": _INDEX_ETAG})
     
     app.mount("/", StaticFiles(directory=static_path, html=True), name="static")
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Database models for the mooring line monitoring system
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -32,13 +32,15 @@ class MooringLine(Base):
     installation_date = Column(DateTime, default=datetime.utcnow)  # 설치일
     expected_lifespan_days = Column(Integer, default=365)  # 예상 수명 (일)
     remaining_lifespan_percentage = Column(Float, default=100.0)  # 잔여 수명 (%)
+    critical_sample_count = Column(Integer, default=0)  # CRITICAL 장력 기록 누적 개수 (수명 계산용, 기록 시 증가)
     
     # 상태 정보
     is_active = Column(Boolean, default=True)  # 활성 상태
+    last_status = Column(String(20), default="NORMAL")  # 마지막 기록의 장력 상태 (상태 전이 시에만 경고 생성)
     last_inspection_date = Column(DateTime)  # 마지막 점검일
     
-    # Relationships
-    tension_history = relationship("TensionHistory", back_populates="mooring_line", cascade="all, delete-orphan")
+    # Relationships (lazy="raise": 조회가 필요하면 selectinload()로 명시적으로 로드)
+    tension_history = relationship("TensionHistory", back_populates="mooring_line", cascade="all, delete-orphan", lazy="raise")
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -58,17 +60,22 @@ class TensionHistory(Base):
     
     # 원시 타임스탬프 (센서에서 온 시간)
     raw_timestamp = Column(String(20))  # 예: "22:59:42.719"
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)  # 시스템 저장 시간
+    timestamp = Column(DateTime, default=datetime.utcnow)  # 시스템 저장 시간 (ix_tension_line_ts로 인덱싱)
     
     # 장력 상태
     status = Column(String(20))  # NORMAL, WARNING, CRITICAL
     
     # Relationship
-    mooring_line = relationship("MooringLine", back_populates="tension_history")
+    mooring_line = relationship("MooringLine", back_populates="tension_history", lazy="raise")
     
     # 날씨 정보 참조
     weather_id = Column(Integer, ForeignKey("weather_data.id"))
-    weather = relationship("WeatherData", back_populates="tension_records")
+    weather = relationship("WeatherData", back_populates="tension_records", lazy="raise")
+
+
+# 계류줄별 최근 N개 / 기간 조회용 - 최신순 조회(ORDER BY timestamp DESC LIMIT N)가 인덱스 순서 그대로 읽힘
+# (mooring_line_id 단독 조회도 선두 컬럼으로 커버)
+Index("ix_tension_line_ts", TensionHistory.mooring_line_id, TensionHistory.timestamp.desc())
 
 
 class WeatherData(Base):
@@ -90,7 +97,7 @@ class WeatherData(Base):
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
-    tension_records = relationship("TensionHistory", back_populates="weather")
+    tension_records = relationship("TensionHistory", back_populates="weather", lazy="raise")
 
 
 class Alert(Base):
@@ -110,4 +117,4 @@ class Alert(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
-    mooring_line = relationship("MooringLine")
\ No newline at end of file
+    mooring_line = relationship("MooringLine", lazy="raise")
\ No newline at end of file
@@ -107,6 +107,7 @@ class TensionTimeSeriesData(BaseModel):
     humidity: Optional[float] = None
     wind_speed: Optional[float] = None
     wind_direction: Optional[float] = None
+    id: Optional[int] = None  # 원시 이력 행 id (페이지 커서용, 구간 집계에는 없음)
 
 
 # Weather Schemas
@@ -2,18 +2,30 @@
 Business logic services
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
-from typing import List, Optional
+from sqlalchemy import desc, insert, case, cast, func, tuple_, Integer
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import math
 import random  # For simulation
 from src.models import MooringLine, TensionHistory, WeatherData, Alert
 from src.schemas import (
     MooringLineCreate, MooringLineUpdate, TensionHistoryCreate,
     WeatherDataCreate, AlertCreate, TensionStatus, AlertSeverity, AlertType,
-    TensionTimeSeriesData
+    TensionHistoryResponse, TensionTimeSeriesData
 )
 
 
+# 풍향(도) → 라디안 변환 계수 (구간별 풍향 원형 평균용)
+_DEG_TO_RAD = math.pi / 180
+
+
+def _mean_direction(mean_sin: Optional[float], mean_cos: Optional[float]) -> Optional[float]:
+    """sin/cos 평균으로 원형 평균 풍향(0~360도) 계산 (날씨가 없는 구간은 None)"""
+    if mean_sin is None or mean_cos is None:
+        return None
+    return round(math.degrees(math.atan2(mean_sin, mean_cos)), 1) % 360
+
+
 class MooringLineService:
     """계류줄 관련 서비스"""
     
@@ -54,9 +66,9 @@ class MooringLineService:
         if not mooring_line:
             return None
         
-        update_data = data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(mooring_line, field, value)
+        # 요청에 포함된 필드만 반영 (exclude_unset dict를 만들지 않고 설정된 필드만 순회)
+        for field in data.model_fields_set:
+            setattr(mooring_line, field, getattr(data, field))
         
         db.commit()
         db.refresh(mooring_line)
@@ -65,32 +77,38 @@ class MooringLineService:
     @staticmethod
     def calculate_tension_status(tension: float, reference: float, max_tension: float) -> TensionStatus:
         """장력 상태 계산"""
-        percentage = (tension / reference) * 100
-        
-        if tension >= max_tension * 0.9:  # 최대 장력의 90% 이상
+        return MooringLineService.status_for_thresholds(
+            tension, *MooringLineService.tension_thresholds(reference, max_tension)
+        )
+    
+    @staticmethod
+    def tension_thresholds(reference: float, max_tension: float) -> tuple:
+        """(CRITICAL, WARNING) 임계 장력 - 계류줄마다 한 번 계산해 반복 판정에 재사용"""
+        return max_tension * 0.9, reference * 1.2  # 최대 장력의 90%, 기준 장력의 120%
+    
+    @staticmethod
+    def status_for_thresholds(tension: float, critical: float, warning: float) -> TensionStatus:
+        """미리 계산한 임계값으로 장력 상태 판정 (곱셈/나눗셈 없이 비교만)"""
+        if tension >= critical:
             return TensionStatus.CRITICAL
-        elif percentage >= 120:  # 기준 장력의 120% 이상
+        if tension >= warning:
             return TensionStatus.WARNING
-        else:
-            return TensionStatus.NORMAL
+        return TensionStatus.NORMAL
     
     @staticmethod
-    def update_lifespan(db: Session, line_id: int):
-        """수명 업데이트 (장력 누적 기반)"""
+    def update_lifespan(db: Session, line_id: int, now: Optional[datetime] = None):
+        """수명 업데이트 (장력 누적 기반, 여러 계류줄을 갱신할 때는 같은 now를 넘겨 재사용)"""
         mooring_line = db.query(MooringLine).filter(MooringLine.id == line_id).first()
         if not mooring_line:
             return
         
         # 설치일로부터 경과 일수 계산
-        days_used = (datetime.utcnow() - mooring_line.installation_date).days
+        if now is None:
+            now = datetime.utcnow()
+        days_used = (now - mooring_line.installation_date).days
         
-        # 과장력 누적 시간 고려 (간단한 계산)
-        critical_hours = db.query(TensionHistory).filter(
-            and_(
-                TensionHistory.mooring_line_id == line_id,
-                TensionHistory.status == TensionStatus.CRITICAL.value
-            )
-        ).count() / 12  # 5분 간격 데이터 가정
+        # 과장력 누적 시간 고려 (간단한 계산) - 이력 테이블을 세지 않고 기록 시 누적한 개수 사용
+        critical_hours = (mooring_line.critical_sample_count or 0) / 12  # 5분 간격 데이터 가정
         
         # 수명 계산 (과장력 시간은 2배로 계산)
         effective_days = days_used + (critical_hours / 24) * 2
@@ -104,11 +122,16 @@ class TensionService:
     """장력 데이터 서비스"""
     
     @staticmethod
-    def record_tension(db: Session, data: TensionHistoryCreate) -> TensionHistory:
-        """장력 데이터 기록"""
-        mooring_line = db.query(MooringLine).filter(MooringLine.id == data.mooring_line_id).first()
-        if not mooring_line:
-            raise ValueError(f"Mooring line {data.mooring_line_id} not found")
+    def record_tension(
+        db: Session,
+        data: TensionHistoryCreate,
+        mooring_line: Optional[MooringLine] = None
+    ) -> TensionHistoryResponse:
+        """장력 데이터 기록 (이미 조회한 계류줄을 넘기면 계류줄 SELECT 생략)"""
+        if mooring_line is None:
+            mooring_line = db.query(MooringLine).filter(MooringLine.id == data.mooring_line_id).first()
+            if not mooring_line:
+                raise ValueError(f"Mooring line {data.mooring_line_id} not found")
         
         # 장력 상태 계산
         status = MooringLineService.calculate_tension_status(
@@ -117,27 +140,87 @@ class TensionService:
             mooring_line.max_tension
         )
         
-        # 장력 이력 저장
-        tension_history = TensionHistory(
-            mooring_line_id=data.mooring_line_id,
-            tension_value=data.tension_value,
-            status=status.value,
-            weather_id=data.weather_id
-        )
-        db.add(tension_history)
+        # 장력 이력 저장 (INSERT ... RETURNING으로 id/timestamp를 함께 받아 refresh 왕복 제거)
+        values = {
+            'mooring_line_id': data.mooring_line_id,
+            'tension_value': data.tension_value,
+            'status': status.value,
+            'weather_id': data.weather_id
+        }
+        inserted = db.execute(
+            insert(TensionHistory).returning(TensionHistory.id, TensionHistory.timestamp),
+            values
+        ).one()
         
         # 현재 장력 업데이트
         mooring_line.current_tension = data.tension_value
         
-        # 경고 생성 (필요시)
         if status == TensionStatus.CRITICAL:
-            AlertService.create_tension_alert(db, mooring_line, data.tension_value, AlertSeverity.CRITICAL)
-        elif status == TensionStatus.WARNING:
-            AlertService.create_tension_alert(db, mooring_line, data.tension_value, AlertSeverity.HIGH)
+            # UPDATE ... SET critical_sample_count = critical_sample_count + 1 (동시 기록에도 누락 없음)
+            mooring_line.critical_sample_count = MooringLine.critical_sample_count + 1
+        
+        # 경고 생성 (WARNING/CRITICAL 상태로 바뀐 경우에만 - 같은 상태가 이어지는 동안은 생성하지 않음)
+        if status != TensionStatus.NORMAL and status.value != mooring_line.last_status:
+            severity = AlertSeverity.CRITICAL if status == TensionStatus.CRITICAL else AlertSeverity.HIGH
+            AlertService.create_tension_alert(db, mooring_line, data.tension_value, severity)
+        mooring_line.last_status = status.value
         
         db.commit()
-        db.refresh(tension_history)
-        return tension_history
+        return TensionHistoryResponse(id=inserted.id, timestamp=inserted.timestamp, **values)
+    
+    @staticmethod
+    def record_tension_many(db: Session, items: List[Dict], line_map: Dict[int, MooringLine]) -> int:
+        """
+        장력 데이터 일괄 기록 (record_tension과 같은 규칙, 커밋은 1회)
+        items: TensionHistory 컬럼 dict (시간순) - mooring_line_id, tension_value 필수,
+               weather_id, timestamp 선택. TensionHistoryCreate에는 timestamp가 없어
+               과거 시각으로 채우는 샘플/백필 데이터를 표현할 수 없으므로 dict로 받음
+        line_map: 미리 조회한 {계류줄 id: MooringLine}
+        """
+        if not items:
+            return 0
+        
+        # 기록 전에 계류줄 id를 한 번에 검증 (일부만 저장되거나 KeyError로 끝나지 않도록)
+        missing = {item['mooring_line_id'] for item in items} - line_map.keys()
+        if missing:
+            raise ValueError(f"Mooring line(s) {sorted(missing)} not found in line_map")
+        
+        thresholds = {
+            line_id: MooringLineService.tension_thresholds(line.reference_tension, line.max_tension)
+            for line_id, line in line_map.items()
+        }
+        classify = MooringLineService.status_for_thresholds  # 행마다 호출 - 클래스 속성 조회를 루프 밖으로
+        critical_counts = dict.fromkeys(line_map, 0)
+        history_rows = []
+        alert_rows = []
+        
+        for item in items:
+            line = line_map[item['mooring_line_id']]
+            tension = item['tension_value']
+            status = classify(tension, *thresholds[line.id])
+            history_rows.append({**item, 'status': status.value})
+            
+            if status == TensionStatus.CRITICAL:
+                critical_counts[line.id] += 1
+            
+            # 경고 생성 (상태 전이 시에만)
+            if status != TensionStatus.NORMAL and status.value != line.last_status:
+                severity = AlertSeverity.CRITICAL if status == TensionStatus.CRITICAL else AlertSeverity.HIGH
+                alert_rows.append(AlertService.build_tension_alert(line, tension, severity))
+            line.last_status = status.value
+            
+            # 현재 장력 = 마지막 값
+            line.current_tension = tension
+        
+        for line_id, count in critical_counts.items():
+            if count:
+                line_map[line_id].critical_sample_count = MooringLine.critical_sample_count + count
+        
+        db.execute(insert(TensionHistory), history_rows)
+        if alert_rows:
+            db.execute(insert(Alert), alert_rows)
+        db.commit()
+        return len(history_rows)
     
     @staticmethod
     def get_tension_history(
@@ -145,10 +228,25 @@ class TensionService:
         line_id: int,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
-        limit: int = 100
+        limit: int = 100,
+        before: Optional[datetime] = None,
+        before_id: Optional[int] = None
     ) -> List[TensionTimeSeriesData]:
-        """장력 이력 조회"""
-        query = db.query(TensionHistory, WeatherData).outerjoin(
+        """장력 이력 조회 (before/before_id 지정 시 그 행 이전의 최신 limit개 - 페이지 단위 조회용)
+        
+        같은 시각에 여러 행이 기록되므로 커서는 (timestamp, id) 쌍으로 비교
+        """
+        # 필요한 컬럼만 조회 (ORM 객체 생성 없이 Row 튜플)
+        query = db.query(
+            TensionHistory.id,
+            TensionHistory.timestamp,
+            TensionHistory.tension_value,
+            TensionHistory.status,
+            WeatherData.temperature,
+            WeatherData.humidity,
+            WeatherData.wind_speed,
+            WeatherData.wind_direction
+        ).outerjoin(
             WeatherData, TensionHistory.weather_id == WeatherData.id
         ).filter(TensionHistory.mooring_line_id == line_id)
         
@@ -156,27 +254,90 @@ class TensionService:
             query = query.filter(TensionHistory.timestamp >= start_time)
         if end_time:
             query = query.filter(TensionHistory.timestamp <= end_time)
+        if before and before_id is not None:
+            query = query.filter(tuple_(TensionHistory.timestamp, TensionHistory.id) < (before, before_id))
+        elif before:
+            query = query.filter(TensionHistory.timestamp < before)
         
-        query = query.order_by(desc(TensionHistory.timestamp)).limit(limit)
+        query = query.order_by(desc(TensionHistory.timestamp), desc(TensionHistory.id)).limit(limit)
         results = query.all()
         
-        time_series_data = []
-        for tension, weather in results:
-            data = TensionTimeSeriesData(
-                timestamp=tension.timestamp,
-                tension_value=tension.tension_value,
-                status=TensionStatus(tension.status) if tension.status else TensionStatus.NORMAL
+        # 최신순으로 조회한 결과를 역순으로 읽어 시간순으로 반환 (날씨가 없으면 None)
+        return [
+            TensionTimeSeriesData(
+                timestamp=row.timestamp,
+                tension_value=row.tension_value,
+                status=row.status or TensionStatus.NORMAL,
+                temperature=row.temperature,
+                humidity=row.humidity,
+                wind_speed=row.wind_speed,
+                wind_direction=row.wind_direction,
+                id=row.id
             )
-            
-            if weather:
-                data.temperature = weather.temperature
-                data.humidity = weather.humidity
-                data.wind_speed = weather.wind_speed
-                data.wind_direction = weather.wind_direction
-            
-            time_series_data.append(data)
+            for row in reversed(results)
+        ]
+    
+    @staticmethod
+    def get_tension_buckets(
+        db: Session,
+        line_id: int,
+        start_time: datetime,
+        bucket_seconds: int,
+        limit: int = 1000
+    ) -> List[TensionTimeSeriesData]:
+        """장력 이력을 시간 구간별로 집계해 조회 (차트용 서버 측 다운샘플링)
+        
+        구간별 평균 장력, 구간 내 가장 심각한 상태, 평균 날씨 값을 반환
+        (풍향은 각도라 sin/cos 평균으로 구한 원형 평균 - 350°와 10°의 평균은 0°)
+        """
+        # 타임스탬프(UTC, naive)를 epoch 초로 변환 - DB별 함수 차이만 분기
+        if db.bind.dialect.name == "sqlite":
+            epoch = cast(func.strftime('%s', TensionHistory.timestamp), Integer)
+        else:
+            # extract()는 소수 초를 포함하고 정수 캐스트는 반올림하므로 floor로 SQLite와 같이 버림 처리
+            epoch = cast(func.floor(func.extract('epoch', TensionHistory.timestamp)), Integer)
+        bucket = (epoch // bucket_seconds).label("bucket")
+        status_rank = case(
+            (TensionHistory.status == TensionStatus.CRITICAL.value, 2),
+            (TensionHistory.status == TensionStatus.WARNING.value, 1),
+            else_=0
+        )
+        
+        results = db.query(
+            bucket,
+            func.avg(TensionHistory.tension_value),
+            func.max(status_rank),
+            func.avg(WeatherData.temperature),
+            func.avg(WeatherData.humidity),
+            func.avg(WeatherData.wind_speed),
+            func.avg(func.sin(WeatherData.wind_direction * _DEG_TO_RAD)),
+            func.avg(func.cos(WeatherData.wind_direction * _DEG_TO_RAD))
+        ).outerjoin(
+            WeatherData, TensionHistory.weather_id == WeatherData.id
+        ).filter(
+            TensionHistory.mooring_line_id == line_id,
+            TensionHistory.timestamp >= start_time
+        ).group_by(bucket).order_by(desc(bucket)).limit(limit).all()
         
-        return time_series_data[::-1]  # Reverse to get chronological order
+        # 최신 구간부터 limit개를 조회했으므로 역순으로 읽어 시간순으로 반환 (역순 복사본 없음)
+        statuses = (TensionStatus.NORMAL, TensionStatus.WARNING, TensionStatus.CRITICAL)
+        return [
+            TensionTimeSeriesData(
+                timestamp=datetime.utcfromtimestamp(bucket_index * bucket_seconds),
+                tension_value=tension,
+                status=statuses[rank or 0],
+                temperature=temperature,
+                humidity=humidity,
+                wind_speed=wind_speed,
+                wind_direction=_mean_direction(mean_sin, mean_cos)
+            )
+            for (bucket_index, tension, rank, temperature, humidity, wind_speed, mean_sin, mean_cos)
+            in reversed(results)
+        ]
+
+
+# 8방위 풍향 이름 (호출마다 리스트를 새로 만들지 않도록 모듈 상수로 둠)
+_WIND_DIRECTIONS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
 
 
 class WeatherService:
@@ -199,9 +360,7 @@ class WeatherService:
     @staticmethod
     def get_wind_direction_text(degrees: float) -> str:
         """풍향 각도를 텍스트로 변환"""
-        directions = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
-        index = round(degrees / 45) % 8
-        return directions[index]
+        return _WIND_DIRECTIONS[round(degrees / 45) % 8]
 
 
 class AlertService:
@@ -215,6 +374,18 @@ class AlertService:
         severity: AlertSeverity
     ) -> Alert:
         """장력 경고 생성"""
+        alert = Alert(**AlertService.build_tension_alert(mooring_line, tension_value, severity))
+        db.add(alert)
+        # Don't commit here, let the caller commit
+        return alert
+    
+    @staticmethod
+    def build_tension_alert(
+        mooring_line: MooringLine,
+        tension_value: float,
+        severity: AlertSeverity
+    ) -> Dict:
+        """장력 경고 행 데이터 (일괄 insert용 dict)"""
         alert_type = AlertType.TENSION_CRITICAL if severity == AlertSeverity.CRITICAL else AlertType.TENSION_WARNING
         
         message = f"Mooring line '{mooring_line.name}' tension ({tension_value:.1f} kN) "
@@ -223,20 +394,28 @@ class AlertService:
         else:
             message += f"exceeded warning threshold ({mooring_line.reference_tension * 1.2:.1f} kN)"
         
-        alert = Alert(
-            mooring_line_id=mooring_line.id,
-            alert_type=alert_type.value,
-            message=message,
-            severity=severity.value
-        )
-        db.add(alert)
-        # Don't commit here, let the caller commit
-        return alert
+        return {
+            'mooring_line_id': mooring_line.id,
+            'alert_type': alert_type.value,
+            'message': message,
+            'severity': severity.value
+        }
+    
+    @staticmethod
+    def get_active_alerts(db: Session, limit: Optional[int] = None) -> List[Alert]:
+        """활성 경고 조회 (limit 지정 시 최신 limit개)"""
+        query = db.query(Alert).filter(Alert.is_resolved == False).order_by(desc(Alert.created_at))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
     
     @staticmethod
-    def get_active_alerts(db: Session) -> List[Alert]:
-        """활성 경고 조회"""
-        return db.query(Alert).filter(Alert.is_resolved == False).order_by(desc(Alert.created_at)).all()
+    def count_active_alerts_by_severity(db: Session) -> Dict[str, int]:
+        """활성 경고 심각도별 개수 (행을 가져오지 않고 집계만)"""
+        counts = db.query(Alert.severity, func.count()).filter(
+            Alert.is_resolved == False
+        ).group_by(Alert.severity).all()
+        return {severity: count for severity, count in counts}
     
     @staticmethod
     def resolve_alert(db: Session, alert_id: int) -> Optional[Alert]:
@@ -272,26 +451,36 @@ class SimulationService:
             )
             lines.append(line)
         
-        # 최근 24시간 데이터 생성
+        # 최근 24시간 데이터 생성 - 행을 모아 record_tension_many로 저장하고 커밋은 한 번만
+        # (레코드마다 record_tension을 호출해 조회/INSERT/커밋하던 방식 대체)
         now = datetime.utcnow()
-        for hours_ago in range(24, -1, -1):
-            timestamp = now - timedelta(hours=hours_ago)
-            
-            # 날씨 데이터 생성
-            weather = WeatherService.record_weather(
-                db,
-                WeatherDataCreate(
-                    temperature=20 + random.uniform(-5, 5),
-                    humidity=60 + random.uniform(-20, 20),
-                    wind_speed=5 + random.uniform(0, 10),
-                    wind_direction=random.uniform(0, 360),
-                    pressure=1013 + random.uniform(-10, 10),
-                    wave_height=0.5 + random.uniform(0, 2)
-                )
-            )
+        hours = list(range(24, -1, -1))
+        
+        # 날씨 데이터 생성 (시간당 1건, id는 RETURNING으로 입력 순서대로 받음)
+        weather_rows = [
+            {
+                'temperature': 20 + random.uniform(-5, 5),
+                'humidity': 60 + random.uniform(-20, 20),
+                'wind_speed': 5 + random.uniform(0, 10),
+                'wind_direction': random.uniform(0, 360),
+                'pressure': 1013 + random.uniform(-10, 10),
+                'wave_height': 0.5 + random.uniform(0, 2),
+                'timestamp': now - timedelta(hours=hours_ago)
+            }
+            for hours_ago in hours
+        ]
+        weather_ids = db.scalars(
+            insert(WeatherData).returning(WeatherData.id, sort_by_parameter_order=True),
+            weather_rows
+        ).all()
+        
+        items = []
+        for hours_ago, weather_row, weather_id in zip(hours, weather_rows, weather_ids):
+            timestamp = weather_row['timestamp']
             
-            # 각 계류줄의 장력 데이터 생성 (5분 간격)
+            # 각 계류줄의 장력 데이터 생성 (5분 간격, 해당 시각에서 끝나도록)
             for minutes in range(0, 60, 5):
+                sample_time = timestamp - timedelta(minutes=55 - minutes)
                 for line in lines:
                     # 시간대별로 다른 장력 패턴 생성
                     base_tension = line.reference_tension
@@ -304,17 +493,18 @@ class SimulationService:
                     tension = base_tension + random.uniform(-20, 30)
                     tension = max(0, min(tension, line.max_tension))  # 범위 제한
                     
-                    TensionService.record_tension(
-                        db,
-                        TensionHistoryCreate(
-                            mooring_line_id=line.id,
-                            tension_value=tension,
-                            weather_id=weather.id
-                        )
-                    )
+                    items.append({
+                        'mooring_line_id': line.id,
+                        'tension_value': tension,
+                        'weather_id': weather_id,
+                        'timestamp': sample_time
+                    })
+        
+        # 상태 판정/경고/현재 장력 반영 후 날씨와 함께 한 번에 커밋
+        TensionService.record_tension_many(db, items, {line.id: line for line in lines})
         
         # 수명 업데이트
         for line in lines:
-            MooringLineService.update_lifespan(db, line.id)
+            MooringLineService.update_lifespan(db, line.id, now)
         
         print("Sample data generated successfully!")
\ No newline at end of file
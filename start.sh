@@ -2,8 +2,8 @@
 
 # Start the backend server
 echo "Starting backend server..."
-cd /home/user/webapp/src
-python3 main.py &
+cd /home/user/webapp
+python3 -m src.main &
 BACKEND_PID=$!
 
 # Wait for backend to start